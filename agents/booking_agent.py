@@ -1,7 +1,16 @@
-from dataclasses import dataclass
-from typing import Optional, Tuple, List, Dict
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Iterable, Set, Tuple
 
-from ontology.reasoning import refresh_inferences, parse_iso, overlaps
+from ontology.availability import AvailabilityIndex
+from ontology.equipment import EquipmentCatalog
+from ontology.ids import IdAllocator
+from ontology.room_index import RoomIndex
+from ontology.reasoning import update_inferences
+from ontology.slots import DEFAULT_CALENDAR, SlotCalendar
+from ontology.timecache import booking_minutes, invalidate, set_booking_times, to_iso, to_minutes
+from ontology.transaction import Transaction
 
 
 @dataclass
@@ -22,23 +31,128 @@ class BookingResult:
     repairs: List[str] = None
 
 
+@dataclass
+class _RepairSearch:
+    """
+    State of one bounded ejection-chain search: the transaction holding the moves made so far,
+    remaining budget, the window being freed and the (state, booking, depth) attempts known to fail.
+    """
+    tx: Transaction
+    deadline: float
+    nodes_left: int
+    reserved: List[Tuple[object, int, int]] = field(default_factory=list)
+    failed: Set[tuple] = field(default_factory=set)
+
+    def exhausted(self) -> bool:
+        return self.nodes_left <= 0 or time.monotonic() > self.deadline
+
+    def state(self) -> frozenset:
+        return frozenset((b, b.bookingRoom, b.start) for b in self.tx.touched())
+
+    def is_reserved(self, room, start: int, end: int) -> bool:
+        return any(r == room and start < e and s < end for r, s, e in self.reserved)
+
+
 class BookingAgent:
     HIGH_PRIORITY_THRESHOLD = 8
+    # ejection-chain repair limits
+    REPAIR_MAX_DEPTH = 3
+    REPAIR_NODE_BUDGET = 200
+    REPAIR_TIME_LIMIT = 0.5  # seconds
 
-    def __init__(self, onto, verbose: bool = True):
+    def __init__(self, onto, verbose: bool = True, journal=None, calendar: Optional[SlotCalendar] = None):
         self.onto = onto
         self.verbose = verbose
-        self.repair_time_grid = [
-            "2026-01-05T08:00|2026-01-05T10:00",
-            "2026-01-05T13:00|2026-01-05T15:00",
-            "2026-01-05T15:00|2026-01-05T17:00",
-            "2026-01-06T10:00|2026-01-06T12:00",
-        ]
+        # optional BookingJournal: every create/move is appended (and fsynced) before returning
+        self.journal = journal
+        # slots that repair moves are searched in (by default the fixed REPAIR_SLOTS)
+        self.calendar = calendar or DEFAULT_CALENDAR
+        # booking -> rooms it occupied before being created/moved, pending inference update
+        self._pending_inferences: Dict[object, set] = {}
+        # per-room free/busy index, kept in sync by _create_booking_individual/_move_booking
+        self.availability = AvailabilityIndex(onto)
+        # equipment bitmasks per room/activity + inverted index mask -> rooms
+        self.equipment = EquipmentCatalog(onto.Equipment.instances(), onto.Room.instances())
+        # rooms in best-fit (capacity-sorted) order per equipment mask
+        self.rooms = RoomIndex(self.equipment)
+        # monotonically increasing Booking_<n> names, persisted on the ontology
+        self.ids = IdAllocator(onto)
+        # open Transaction, if any: changes are journaled at commit instead of one by one
+        self._tx: Optional[Transaction] = None
+
+    def add_rooms(self, rooms):
+        """
+        Registers new rooms (or rooms whose capacity/equipment changed) with the room indexes.
+        """
+        for room in rooms:
+            self.equipment.add_room(room)
+        self.rooms.invalidate()
 
     def _log(self, s: str):
         if self.verbose:
             print(s)
 
+    def _note_change(self, booking, old_room=None):
+        rooms = self._pending_inferences.setdefault(booking, set())
+        if old_room is not None:
+            rooms.add(old_room)
+
+    def _flush_inferences(self):
+        """
+        Incrementally updates inferred classes for bookings touched since the last flush.
+        """
+        pending = self._pending_inferences
+        if not pending:
+            return
+        self._pending_inferences = {}
+        old_rooms = set().union(*pending.values())
+        update_inferences(self.onto, pending.keys(), old_rooms)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups booking changes made through this agent. On commit each created/moved booking is
+        journaled once; on rollback (explicit, or on an exception) the old rooms and times are
+        restored and only the affected bookings are re-indexed. Transactions don't nest.
+        """
+        if self._tx is not None:
+            raise RuntimeError("A BookingAgent transaction is already open.")
+        self._tx = Transaction(on_commit=self._journal_changes, on_undo=self._reindex_undone)
+        try:
+            with self._tx as tx:
+                yield tx
+        finally:
+            self._tx = None
+
+    def _journal_changes(self, touched, created):
+        if self.journal is None:
+            return
+        for b in created:
+            self.journal.record_create(b)
+        for b in touched:
+            self.journal.record_move(b)
+
+    def _reindex_undone(self, touched, created):
+        for b in created:
+            self.availability.remove(b)
+            self._pending_inferences.pop(b, None)
+            invalidate(b)
+        for b in touched:
+            invalidate(b)
+            self.availability.move(b)
+
+    def _move_booking(self, booking, room, start_iso: Optional[str] = None, end_iso: Optional[str] = None):
+        self._note_change(booking, booking.bookingRoom)
+        if self._tx is not None:
+            for attr in ("bookingRoom", "start", "end"):
+                self._tx.record(booking, attr)
+        booking.bookingRoom = room
+        if start_iso is not None:
+            set_booking_times(booking, start_iso, end_iso)
+        self.availability.move(booking)
+        if self.journal is not None and self._tx is None:
+            self.journal.record_move(booking)
+
     def _get_activity(self, name: str):
         try:
             obj = self.onto[name]
@@ -57,180 +171,161 @@ class BookingAgent:
         return None
 
     def _room_has_required_equipment(self, room, activity) -> bool:
-        room_eq = set(getattr(room, "hasEquipment", []))
-        req_eq = set(getattr(activity, "requiresEquipment", []))
-        return req_eq.issubset(room_eq)
+        return self.equipment.has_all(room, activity)
 
-    def _room_has_capacity(self, room, activity) -> bool:
-        cap = getattr(room, "capacity", None)
-        exp = getattr(activity, "expectedAttendance", None)
-        if cap is None or exp is None:
-            return True
-        return cap >= exp
+    def _fitting_rooms(self, activity):
+        """
+        Rooms with enough capacity and all required equipment, best fit first
+        (smallest leftover capacity, then more equipment).
+        """
+        return self.rooms.for_activity(activity)
 
     def _room_is_free(self, room, start_iso: str, end_iso: str, ignore_booking=None) -> bool:
-        s = parse_iso(start_iso)
-        e = parse_iso(end_iso)
-
-        for b in self.onto.RoomBooking.instances():
-            if ignore_booking is not None and b == ignore_booking:
-                continue
-            if not b.bookingRoom or b.bookingRoom != room:
-                continue
-            if not b.start or not b.end:
-                continue
-            bs = parse_iso(b.start)
-            be = parse_iso(b.end)
-            if overlaps(s, e, bs, be):
-                return False
-        return True
-
-    def _score_room(self, room, activity) -> Tuple[int, int]:
-        cap = getattr(room, "capacity", 10**9)
-        exp = getattr(activity, "expectedAttendance", 0)
-        leftover = cap - exp
-        eq_count = len(getattr(room, "hasEquipment", []))
-        return (leftover, -eq_count)
+        return self.availability.is_free(room, to_minutes(start_iso), to_minutes(end_iso), ignore_booking=ignore_booking)
 
     def find_candidate_rooms(self, activity, start_iso: str, end_iso: str, ignore_booking=None):
+        """
+        Free rooms that fit the activity, already in best-fit order.
+        """
         candidates = []
-        for room in self.onto.Room.instances():
-            if not self._room_has_capacity(room, activity):
-                continue
-            if not self._room_has_required_equipment(room, activity):
-                continue
+        for room in self._fitting_rooms(activity):
             if not self._room_is_free(room, start_iso, end_iso, ignore_booking=ignore_booking):
                 continue
             candidates.append(room)
         return candidates
 
     def _create_booking_individual(self, activity, room, start_iso: str, end_iso: str, priority: int) -> str:
-        booking_id = f"Booking_{len(self.onto.RoomBooking.instances()) + 1}"
+        booking_id = self.ids.next_id()
         b = self.onto.RoomBooking(booking_id)
         b.bookingRoom = room
         b.bookingOf = activity
-        b.start = start_iso
-        b.end = end_iso
+        set_booking_times(b, start_iso, end_iso)
         b.priority = priority
+        self._note_change(b)
+        self.availability.add(b)
+        if self._tx is not None:
+            self._tx.created(b)
+        elif self.journal is not None:
+            self.journal.record_create(b)
         return booking_id
 
-    def _blocking_bookings(self, start_iso: str, end_iso: str) -> List[object]:
-        s = parse_iso(start_iso)
-        e = parse_iso(end_iso)
-        blockers = []
-        for b in self.onto.RoomBooking.instances():
-            if not b.start or not b.end:
-                continue
-            bs = parse_iso(b.start)
-            be = parse_iso(b.end)
-            if overlaps(s, e, bs, be):
-                blockers.append(b)
-        return blockers
+    @staticmethod
+    def _priority(booking) -> int:
+        try:
+            return int(getattr(booking, "priority", 0) or 0)
+        except Exception:
+            return 0
 
-    def _try_relocate_booking(self, booking) -> bool:
+    def _try_relocate_booking(self, booking, search: _RepairSearch, depth: int = 0) -> bool:
+        """
+        Moves booking to another room at the same time, or else to the earliest free calendar slot.
+        With depth > 0 it may also take a room held only by lower-priority bookings and relocate
+        those in turn (an ejection chain), up to `depth` further levels.
+        """
         if not booking.bookingOf or not booking.bookingRoom:
             return False
 
+        key = (tuple(search.reserved), search.state(), booking, depth)
+        if key in search.failed or search.exhausted():
+            return False
+        search.nodes_left -= 1
+
         act = booking.bookingOf
+        span = booking_minutes(booking)
+        if span is None:
+            return False
+        rooms = self._fitting_rooms(act)
+        old = (booking.bookingRoom.name, booking.start, booking.end)
 
         # same time, different room
-        for room in self.onto.Room.instances():
-            if room == booking.bookingRoom:
-                continue
-            if not self._room_has_capacity(room, act):
-                continue
-            if not self._room_has_required_equipment(room, act):
+        for room in rooms:
+            if room == booking.bookingRoom or search.is_reserved(room, *span):
                 continue
-            if self._room_is_free(room, booking.start, booking.end, ignore_booking=booking):
-                old = (booking.bookingRoom.name, booking.start, booking.end)
-                booking.bookingRoom = room
+            if self.availability.is_free(room, span[0], span[1], ignore_booking=booking):
+                self._move_booking(booking, room)
                 self._log(f"[repair] moved {booking.name}: {old[0]} {old[1]}..{old[2]}  ->  {room.name} {booking.start}..{booking.end}")
                 return True
 
-        # other time + room
-        for pair in self.repair_time_grid:
-            new_start, new_end = pair.split("|", 1)
-            for room in self.onto.Room.instances():
-                if not self._room_has_capacity(room, act):
-                    continue
-                if not self._room_has_required_equipment(room, act):
+        # other time + room: earliest free calendar slot of the same length, best-fit room first
+        slots = self.calendar.free_slots_in(self.availability, rooms, span[1] - span[0], ignore_booking=booking)
+        for start, end, room in slots:
+            if (room == booking.bookingRoom and (start, end) == span) or search.is_reserved(room, start, end):
+                continue
+            new_start, new_end = to_iso(start), to_iso(end)
+            self._move_booking(booking, room, new_start, new_end)
+            self._log(f"[repair] moved {booking.name}: {old[0]} {old[1]}..{old[2]}  ->  {room.name} {new_start}..{new_end}")
+            return True
+
+        # same time, taking a room from lower-priority bookings that then have to move themselves
+        if depth > 0:
+            prio = self._priority(booking)
+            in_chain = set(search.tx.touched())
+            options = []
+            for rank, room in enumerate(rooms):
+                if room == booking.bookingRoom or search.is_reserved(room, *span):
                     continue
-                if self._room_is_free(room, new_start, new_end, ignore_booking=booking):
-                    old = (booking.bookingRoom.name, booking.start, booking.end)
-                    booking.start = new_start
-                    booking.end = new_end
-                    booking.bookingRoom = room
-                    self._log(f"[repair] moved {booking.name}: {old[0]} {old[1]}..{old[2]}  ->  {room.name} {new_start}..{new_end}")
+                blockers = [b for b in self.availability.bookings_in(room, *span) if b != booking]
+                if blockers and all(self._priority(b) < prio and b not in in_chain for b in blockers):
+                    options.append((len(blockers), rank, room, blockers))
+            options.sort(key=lambda o: o[:2])
+
+            for _, _, room, blockers in options:
+                mark = search.tx.savepoint()
+                self._move_booking(booking, room)
+                self._log(f"[repair] moved {booking.name}: {old[0]} {old[1]}..{old[2]}  ->  {room.name}, displacing {', '.join(b.name for b in blockers)}")
+                if all(self._try_relocate_booking(b, search, depth - 1) for b in blockers):
                     return True
+                search.tx.rollback_to(mark)
 
+        search.failed.add(key)
         return False
 
     def _try_priority_repair(self, activity, start_iso: str, end_iso: str, req_priority: int) -> bool:
-        acceptable_rooms = []
-        for room in self.onto.Room.instances():
-            if not self._room_has_capacity(room, activity):
-                continue
-            if not self._room_has_required_equipment(room, activity):
-                continue
-            acceptable_rooms.append(room)
+        """
+        Frees a fitting room for [start_iso, end_iso) by relocating lower-priority bookings,
+        searching ejection chains up to REPAIR_MAX_DEPTH moves deep within the node budget and
+        time limit. All moves are undone if no room can be freed.
+        """
+        ranked_rooms = self._fitting_rooms(activity)
 
-        if not acceptable_rooms:
+        if not ranked_rooms:
             self._log("[repair] no rooms satisfy capacity/equipment even ignoring conflicts.")
             return False
 
-        # Rank rooms by heuristic so we know which room we'd prefer to free
-        acceptable_rooms.sort(key=lambda r: self._score_room(r, activity))
-        preferred_room = acceptable_rooms[0]
-        self._log(f"[repair] preferred target room to free: {preferred_room.name}")
+        req_s, req_e = to_minutes(start_iso), to_minutes(end_iso)
 
-        blockers = []
-        for b in self._blocking_bookings(start_iso, end_iso):
-            if not b.bookingRoom:
-                continue
-            if b.bookingRoom in acceptable_rooms:
-                try:
-                    prio = int(getattr(b, "priority", 0) or 0)
-                except Exception:
-                    prio = 0
-                if prio < req_priority:
-                    # record whether it blocks the preferred room
-                    blocks_preferred = (b.bookingRoom == preferred_room)
-                    blockers.append((0 if blocks_preferred else 1, prio, b))
-
-        if not blockers:
+        # rooms blocked only by lower-priority bookings: fewest blockers first, then best fit
+        options = []
+        for rank, room in enumerate(ranked_rooms):
+            blockers = self.availability.bookings_in(room, req_s, req_e)
+            if blockers and all(self._priority(b) < req_priority for b in blockers):
+                options.append((len(blockers), rank, room, blockers))
+
+        if not options:
             self._log("[repair] no lower-priority blockers found for acceptable rooms.")
             return False
+        options.sort(key=lambda o: o[:2])
 
-        # Prefer blockers that block the best room; then lowest priority
-        blockers.sort(key=lambda x: (x[0], x[1]))
-        _, _, booking_to_move = blockers[0]
+        with self.transaction() as tx:
+            search = _RepairSearch(tx, time.monotonic() + self.REPAIR_TIME_LIMIT, self.REPAIR_NODE_BUDGET)
+            for _, _, room, blockers in options:
+                search.reserved = [(room, req_s, req_e)]
+                self._log(f"[repair] trying to free '{room.name}' by moving {', '.join(b.name for b in blockers)}")
 
-        self._log(
-            f"[repair] trying to free '{booking_to_move.bookingRoom.name}' by moving "
-            f"{booking_to_move.name} (prio {getattr(booking_to_move,'priority',0)})"
-        )
-
-        old_room = booking_to_move.bookingRoom
-        old_start = booking_to_move.start
-        old_end = booking_to_move.end
+                if all(self._try_relocate_booking(b, search, self.REPAIR_MAX_DEPTH - 1) for b in blockers) \
+                        and self.availability.is_free(room, req_s, req_e):
+                    self._log(f"[repair] repair succeeded after {len(tx.touched())} move(s).")
+                    return True
 
-        moved = self._try_relocate_booking(booking_to_move)
-        if not moved:
-            self._log("[repair] failed to relocate blocker booking.")
-            return False
+                tx.rollback_to(0)
+                if search.exhausted():
+                    self._log("[repair] search budget exhausted.")
+                    break
+            tx.rollback()
 
-        candidates = self.find_candidate_rooms(activity, start_iso, end_iso)
-        if candidates:
-            self._log("[repair] repair succeeded: found feasible room after moving blocker.")
-            return True
-
-        booking_to_move.bookingRoom = old_room
-        booking_to_move.start = old_start
-        booking_to_move.end = old_end
-        self._log("[repair] relocation did not free a feasible room; reverted.")
+        self._log("[repair] could not free a feasible room; all moves reverted.")
         return False
 
-
     def explain_failure(self, req: BookingRequest) -> List[str]:
         """
         Returns a list of human-readable reasons why the booking cannot be placed.
@@ -243,6 +338,8 @@ class BookingAgent:
         req_eq = [e.name for e in getattr(activity, "requiresEquipment", [])]
         exp = getattr(activity, "expectedAttendance", None)
         details.append(f"Request: activity={activity.name}, attendance={exp}, requires={req_eq}, time={req.start}..{req.end}")
+        req_s = to_minutes(req.start)
+        req_e = to_minutes(req.end)
 
         for room in self.onto.Room.instances():
             reasons = []
@@ -255,20 +352,13 @@ class BookingAgent:
 
             # equipment
             if req_eq:
-                if not set(getattr(activity, "requiresEquipment", [])).issubset(set(getattr(room, "hasEquipment", []))):
+                if not self._room_has_required_equipment(room, activity):
                     reasons.append(f"missing equipment (room has {room_eq})")
 
             # conflicts
             conflicts = []
-            if room.bookingRoom if False else True:  # no-op, keeps lint calm
-                pass
-            for b in self.onto.RoomBooking.instances():
-                if not b.bookingRoom or b.bookingRoom != room:
-                    continue
-                if not b.start or not b.end:
-                    continue
-                if overlaps(parse_iso(req.start), parse_iso(req.end), parse_iso(b.start), parse_iso(b.end)):
-                    conflicts.append(f"{b.name}({b.start}..{b.end}, prio={getattr(b,'priority', '?')})")
+            for b in self.availability.bookings_in(room, req_s, req_e):
+                conflicts.append(f"{b.name}({b.start}..{b.end}, prio={getattr(b,'priority', '?')})")
             if conflicts:
                 reasons.append("conflict with " + ", ".join(conflicts))
 
@@ -279,10 +369,10 @@ class BookingAgent:
 
         return details
 
-    def create_booking(self, req: BookingRequest) -> BookingResult:
-        repairs_log: List[str] = []
-
-        activity = self._get_activity(req.activity_name)
+    def _place(self, req: BookingRequest, activity, explain: bool = True) -> BookingResult:
+        """
+        Places one request using the shared indexes; inferred classes are left pending.
+        """
         if not activity:
             return BookingResult(ok=False, message="Activity not found.", details=[f"Activity '{req.activity_name}' not found."])
 
@@ -293,14 +383,40 @@ class BookingAgent:
                 candidates = self.find_candidate_rooms(activity, req.start, req.end)
 
         if not candidates:
-            refresh_inferences(self.onto)
-            details = self.explain_failure(req)
+            details = self.explain_failure(req) if explain else []
             return BookingResult(ok=False, message="No suitable room found.", details=details)
 
-        candidates.sort(key=lambda r: self._score_room(r, activity))
         chosen = candidates[0]
 
         booking_id = self._create_booking_individual(activity, chosen, req.start, req.end, req.priority)
-        refresh_inferences(self.onto)
 
-        return BookingResult(ok=True, booking_id=booking_id, room_name=chosen.name, message="Created.")
\ No newline at end of file
+        return BookingResult(ok=True, booking_id=booking_id, room_name=chosen.name, message="Created.")
+
+    def create_booking(self, req: BookingRequest) -> BookingResult:
+        result = self._place(req, self._get_activity(req.activity_name))
+        self._flush_inferences()
+        if self.journal is not None:
+            self.journal.checkpoint()
+        return result
+
+    def create_bookings(self, requests: Iterable[BookingRequest], explain_failures: bool = True) -> List[BookingResult]:
+        """
+        Places a batch of requests (e.g. a semester timetable import) in one pass.
+        Indexes and activity lookups are shared across the batch and inferred classes are
+        updated once at the end instead of after every booking.
+        """
+        activities: Dict[str, object] = {}
+        results: List[BookingResult] = []
+
+        for req in requests:
+            if req.activity_name not in activities:
+                activities[req.activity_name] = self._get_activity(req.activity_name)
+            results.append(self._place(req, activities[req.activity_name], explain=explain_failures))
+
+        self._flush_inferences()
+        if self.journal is not None:
+            self.journal.checkpoint()
+
+        created = sum(1 for r in results if r.ok)
+        self._log(f"[batch] {created}/{len(results)} bookings created.")
+        return results
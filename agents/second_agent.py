@@ -1,6 +1,10 @@
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
-from ontology.reasoning import parse_iso, overlaps
+from ontology.availability import AvailabilityIndex
+from ontology.equipment import EquipmentCatalog
+from ontology.reasoning import find_conflict_pairs
+from ontology.slots import DEFAULT_CALENDAR, SlotCalendar
+from ontology.timecache import booking_minutes, to_iso, to_minutes
 
 
 @dataclass
@@ -15,30 +19,16 @@ class AuditAgent:
     Agent 2: audits inferred problems and proposes minimal-impact repairs.
     """
 
-    def __init__(self, onto):
+    def __init__(self, onto, calendar: Optional[SlotCalendar] = None,
+                 availability: Optional[AvailabilityIndex] = None):
         self.onto = onto
-        self.candidate_times = [
-            "2026-01-05T08:00|2026-01-05T10:00",
-            "2026-01-05T13:00|2026-01-05T15:00",
-            "2026-01-05T15:00|2026-01-05T17:00",
-            "2026-01-06T10:00|2026-01-06T12:00",
-        ]
+        self.calendar = calendar or DEFAULT_CALENDAR
+        # share the BookingAgent's index when there is one, so bookings it makes are seen here
+        self.availability = availability or AvailabilityIndex(onto)
+        self.equipment = EquipmentCatalog(onto.Equipment.instances(), onto.Room.instances())
 
     def _room_is_free(self, room, start_iso: str, end_iso: str, ignore_booking=None) -> bool:
-        s = parse_iso(start_iso)
-        e = parse_iso(end_iso)
-        for b in self.onto.RoomBooking.instances():
-            if ignore_booking and b == ignore_booking:
-                continue
-            if not b.bookingRoom or b.bookingRoom != room:
-                continue
-            if not b.start or not b.end:
-                continue
-            bs = parse_iso(b.start)
-            be = parse_iso(b.end)
-            if overlaps(s, e, bs, be):
-                return False
-        return True
+        return self.availability.is_free(room, to_minutes(start_iso), to_minutes(end_iso), ignore_booking=ignore_booking)
 
     def _room_meets(self, room, activity) -> bool:
         cap = getattr(room, "capacity", None)
@@ -46,9 +36,7 @@ class AuditAgent:
         if cap is not None and exp is not None and cap < exp:
             return False
 
-        room_eq = set(getattr(room, "hasEquipment", []))
-        req_eq = set(getattr(activity, "requiresEquipment", []))
-        if req_eq and not req_eq.issubset(room_eq):
+        if not self.equipment.has_all(room, activity):
             return False
 
         return True
@@ -68,38 +56,15 @@ class AuditAgent:
 
     def _suggest_time_other_room(self, booking) -> Optional[str]:
         act = booking.bookingOf
-        for time_pair in self.candidate_times:
-            start_iso, end_iso = time_pair.split("|", 1)
-            for room in self.onto.Room.instances():
-                if not self._room_meets(room, act):
-                    continue
-                if self._room_is_free(room, start_iso, end_iso, ignore_booking=booking):
-                    return f"{start_iso}..{end_iso} in {room.name}"
+        span = booking_minutes(booking)
+        duration = span[1] - span[0] if span else None
+        rooms = [room for room in self.onto.Room.instances() if self._room_meets(room, act)]
+        for start, end, room in self.calendar.free_slots_in(self.availability, rooms, duration, ignore_booking=booking):
+            return f"{to_iso(start)}..{to_iso(end)} in {room.name}"
         return None
 
     def _find_conflict_pairs(self) -> List[Tuple[object, object]]:
-        bookings = list(self.onto.RoomBooking.instances())
-        pairs = []
-        for i in range(len(bookings)):
-            b1 = bookings[i]
-            if not b1.bookingRoom or not b1.start or not b1.end:
-                continue
-            r = b1.bookingRoom
-            s1 = parse_iso(b1.start)
-            e1 = parse_iso(b1.end)
-
-            for j in range(i + 1, len(bookings)):
-                b2 = bookings[j]
-                if not b2.bookingRoom or not b2.start or not b2.end:
-                    continue
-                if b2.bookingRoom != r:
-                    continue
-                s2 = parse_iso(b2.start)
-                e2 = parse_iso(b2.end)
-
-                if overlaps(s1, e1, s2, e2):
-                    pairs.append((b1, b2))
-        return pairs
+        return [(b1, b2) for _, b1, b2 in find_conflict_pairs(self.onto)]
 
     def generate_suggestions(self) -> List[Suggestion]:
         suggestions: List[Suggestion] = []
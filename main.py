@@ -1,16 +1,64 @@
+import argparse
+import os
 from pathlib import Path
-from owlready2 import get_ontology, onto_path
+from typing import Optional
+
+from owlready2 import default_world, get_ontology, onto_path
 
 from ontology.build_ontology import build_ontology
 from ontology.data_seed import seed_demo_data
+from ontology.journal import BookingJournal
 from ontology.reasoning import refresh_inferences
+from ontology.slots import SlotCalendar
 from ui.cli import run_cli
 
 ONTO_IRI = "http://example.org/room_mgmt.owl"
 OWL_FILENAME = "room_mgmt.owl"
+JOURNAL_FILENAME = "room_mgmt.journal"
+
+
+def create_ontology():
+    # Create new ontology (logical IRI)
+    onto = get_ontology(ONTO_IRI)
+
+    # Build schema (classes + properties) - must NOT save here
+    build_ontology(onto)
+
+    # Seed demo data
+    seed_demo_data(onto)
+
+    # Initial inference refresh
+    refresh_inferences(onto)
+
+    return onto
+
+
+def open_quadstore(project_dir: Path, db_file: Path):
+    """
+    Opens (or initialises) a persistent owlready2 SQLite quadstore.
+    Triples stay on disk, so startup doesn't re-parse RDF/XML and saving only commits changes.
+    """
+    default_world.set_backend(filename=str(db_file))
+
+    onto = default_world.get_ontology(ONTO_IRI)
+    if onto.Room is not None:
+        print(f"Opened ontology from quadstore {db_file}")
+        return onto, False
+
+    # Empty quadstore: import the existing RDF/XML once, or create from scratch
+    owl_file = project_dir / OWL_FILENAME
+    if owl_file.exists():
+        onto = get_ontology(str(owl_file)).load()
+        print(f"Imported {owl_file} into quadstore {db_file}")
+    else:
+        onto = create_ontology()
+        print(f"Created new ontology in quadstore {db_file}")
+
+    default_world.save()
+    return onto, True
 
 
-def load_or_create_ontology(project_dir: Path):
+def load_or_create_ontology(project_dir: Path, db_file: Optional[Path] = None):
     owl_file = project_dir / OWL_FILENAME
 
     # Ensure owlready2 searches this directory for local ontologies
@@ -18,22 +66,15 @@ def load_or_create_ontology(project_dir: Path):
     if dir_str not in onto_path:
         onto_path.append(dir_str)
 
+    if db_file is not None:
+        return open_quadstore(project_dir, db_file)
+
     if owl_file.exists():
         onto = get_ontology(str(owl_file)).load()
         print(f"Loaded ontology from {owl_file}")
         return onto, False
 
-    # Create new ontology (logical IRI)
-    onto = get_ontology(ONTO_IRI)
-
-    # Build schema (classes + properties) - must NOT save here
-    build_ontology(onto)
-
-    # Seed demo data
-    seed_demo_data(onto)
-
-    # Initial inference refresh
-    refresh_inferences(onto)
+    onto = create_ontology()
 
     # Save once, here
     onto.save(file=str(owl_file), format="rdfxml")
@@ -42,21 +83,83 @@ def load_or_create_ontology(project_dir: Path):
     return onto, True
 
 
+def save_snapshot(onto, owl_file: Path):
+    """
+    Writes the RDF/XML snapshot atomically (temp file + rename), so a crash mid-save
+    never leaves a truncated room_mgmt.owl behind.
+    """
+    tmp = owl_file.with_name(owl_file.name + ".tmp")
+    onto.save(file=str(tmp), format="rdfxml")
+    os.replace(tmp, owl_file)
+
+
+def open_journal(project_dir: Path, onto, db_file: Optional[Path] = None) -> BookingJournal:
+    """
+    Opens the booking journal and replays operations not yet in the last snapshot.
+    Each storage backend has its own journal (next to the quadstore with --db), since a journal
+    only makes sense on top of the snapshot it was written after.
+    """
+    if db_file is not None:
+        snapshot = default_world.save
+        journal_file = db_file.with_name(db_file.name + ".journal")
+    else:
+        owl_file = project_dir / OWL_FILENAME
+        snapshot = lambda: save_snapshot(onto, owl_file)
+        journal_file = project_dir / JOURNAL_FILENAME
+
+    journal = BookingJournal(journal_file, snapshot=snapshot)
+    replayed = journal.replay(onto)
+    if replayed:
+        print(f"Replayed {replayed} journaled booking operations")
+    return journal
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Room management console")
+    parser.add_argument(
+        "--db",
+        metavar="FILE",
+        help="use a persistent SQLite quadstore instead of rewriting room_mgmt.owl on every exit",
+    )
+    parser.add_argument(
+        "--slot-grid",
+        action="store_true",
+        help="search repairs and suggestions in the term's weekday slot grid instead of the fixed repair slots",
+    )
+    parser.add_argument(
+        "--slot-minutes",
+        type=int,
+        default=SlotCalendar.slot_minutes,
+        metavar="MINUTES",
+        help="slot length of the --slot-grid calendar (default: %(default)s)",
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
     project_dir = Path(__file__).resolve().parent
     owl_file = project_dir / OWL_FILENAME
+    db_file = Path(args.db).resolve() if args.db else None
 
-    onto, created_new = load_or_create_ontology(project_dir)
+    onto, created_new = load_or_create_ontology(project_dir, db_file)
+    journal = open_journal(project_dir, onto, db_file)
 
     # Keep inferred classes consistent every run
-    refresh_inferences(onto)
+    # (a reopened quadstore already has them, maintained incrementally by the agents)
+    if db_file is None or created_new or journal.pending:
+        refresh_inferences(onto)
 
     # Run console UI
-    run_cli(onto)
-
-    # Persist changes (e.g., new bookings)
-    onto.save(file=str(owl_file), format="rdfxml")
-    print(f"Saved ontology to {owl_file}")
+    calendar = SlotCalendar(slot_minutes=args.slot_minutes) if args.slot_grid else None
+    run_cli(onto, journal=journal, calendar=calendar)
+
+    # Persist changes (e.g., new bookings) and empty the journal
+    journal.compact()
+    if db_file is not None:
+        print(f"Committed changes to {db_file}")
+    else:
+        print(f"Saved ontology to {owl_file}")
 
 
 if __name__ == "__main__":
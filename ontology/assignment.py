@@ -0,0 +1,71 @@
+from typing import List, Optional, Sequence
+
+
+def min_cost_assignment(cost: Sequence[Sequence[Optional[float]]]) -> Optional[List[int]]:
+    """
+    Hungarian algorithm (shortest augmenting paths with potentials), O(n^2 * m).
+
+    cost is an n x m matrix with n <= m; None marks a forbidden pair. Returns, for each row,
+    the column it is assigned to so that the total cost is minimal and no column is used twice,
+    or None if no assignment avoids every forbidden pair.
+    """
+    n = len(cost)
+    if n == 0:
+        return []
+    m = len(cost[0])
+    if n > m:
+        return None
+
+    # Forbidden pairs get a cost no feasible assignment can reach
+    finite = [abs(c) for row in cost for c in row if c is not None]
+    big = 2 * n * (max(finite, default=0) + 1) + 1
+    a = [[big if c is None else c for c in row] for row in cost]
+
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)  # p[j]: row matched to column j (1-based, 0 = free)
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = a[i0 - 1]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    result = [0] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            result[p[j] - 1] = j - 1
+
+    if any(cost[i][result[i]] is None for i in range(n)):
+        return None
+    return result
@@ -0,0 +1,130 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Tuple
+
+from ontology.timecache import booking_minutes
+
+
+class RoomSchedule:
+    """
+    Busy intervals of one room, sorted by start, with a running maximum of end times.
+
+    A room is free in [s, e) iff every booking starting before e has ended by s, i.e.
+    max_end[bisect_left(starts, e) - 1] <= s, so a free/busy check is a single bisect.
+    """
+
+    def __init__(self):
+        self.entries: List[Tuple[int, int, int]] = []  # (start, seq, end), sorted
+        self.bookings: Dict[int, object] = {}  # seq -> booking
+        self.max_end: List[int] = []
+
+    def _rebuild_max_end(self, from_idx: int):
+        del self.max_end[from_idx:]
+        running = self.max_end[-1] if self.max_end else None
+        for _, _, end in self.entries[from_idx:]:
+            running = end if running is None or end > running else running
+            self.max_end.append(running)
+
+    def add(self, start: int, end: int, seq: int, booking):
+        entry = (start, seq, end)
+        insort(self.entries, entry)
+        self.bookings[seq] = booking
+        self._rebuild_max_end(bisect_left(self.entries, entry))
+
+    def remove(self, start: int, end: int, seq: int):
+        idx = bisect_left(self.entries, (start, seq, end))
+        if idx < len(self.entries) and self.entries[idx][1] == seq:
+            del self.entries[idx]
+            self._rebuild_max_end(idx)
+        self.bookings.pop(seq, None)
+
+    def overlapping(self, start: int, end: int) -> List[object]:
+        """
+        Bookings whose interval overlaps [start, end), in start order.
+        """
+        found = []
+        j = bisect_left(self.entries, (end,)) - 1
+        while j >= 0 and self.max_end[j] > start:
+            s, seq, e = self.entries[j]
+            if e > start and s < end:
+                found.append(self.bookings[seq])
+            j -= 1
+        found.reverse()
+        return found
+
+    def is_free(self, start: int, end: int, ignore_booking=None) -> bool:
+        idx = bisect_left(self.entries, (end,))
+        if idx == 0 or self.max_end[idx - 1] <= start:
+            return True
+        if ignore_booking is None:
+            return False
+        return all(b == ignore_booking for b in self.overlapping(start, end))
+
+
+class AvailabilityIndex:
+    """
+    Free/busy index over all rooms, built once from the ontology and kept in sync by calling
+    add()/remove() (or move()) whenever a booking is created, moved or deleted.
+    Free/busy questions then cost O(log bookings-per-room) per room instead of a full booking scan.
+    """
+
+    def __init__(self, onto):
+        self.onto = onto
+        self._schedules: Dict[object, RoomSchedule] = {}
+        self._placed: Dict[object, Tuple[object, int, int, int]] = {}  # booking -> (room, start, end, seq)
+        self._seq = 0
+        for b in onto.RoomBooking.instances():
+            self.add(b)
+
+    def add(self, booking):
+        """
+        Indexes a booking under its current bookingRoom/start/end.
+        """
+        if booking in self._placed:
+            self.remove(booking)
+
+        room = getattr(booking, "bookingRoom", None)
+        span = booking_minutes(booking)
+        if room is None or span is None:
+            return
+
+        self._seq += 1
+        self._placed[booking] = (room, span[0], span[1], self._seq)
+        self._schedules.setdefault(room, RoomSchedule()).add(span[0], span[1], self._seq, booking)
+
+    def remove(self, booking):
+        placed = self._placed.pop(booking, None)
+        if placed is None:
+            return
+        room, start, end, seq = placed
+        self._schedules[room].remove(start, end, seq)
+
+    def move(self, booking):
+        """
+        Re-indexes a booking after its room or times changed.
+        """
+        self.remove(booking)
+        self.add(booking)
+
+    def is_free(self, room, start: int, end: int, ignore_booking=None) -> bool:
+        schedule = self._schedules.get(room)
+        if schedule is None:
+            return True
+        return schedule.is_free(start, end, ignore_booking)
+
+    def bookings_in(self, room, start: int, end: int) -> List[object]:
+        schedule = self._schedules.get(room)
+        if schedule is None:
+            return []
+        return schedule.overlapping(start, end)
+
+    def overlapping(self, start: int, end: int) -> List[object]:
+        """
+        Bookings in any room that overlap [start, end).
+        """
+        found = []
+        for schedule in self._schedules.values():
+            found.extend(schedule.overlapping(start, end))
+        return found
+
+    def free_rooms(self, rooms, start: int, end: int, ignore_booking=None) -> List[object]:
+        return [r for r in rooms if self.is_free(r, start, end, ignore_booking)]
@@ -1,4 +1,4 @@
-from owlready2 import Thing, ObjectProperty, DataProperty, FunctionalProperty
+from owlready2 import Thing, ObjectProperty, DataProperty, FunctionalProperty, AnnotationProperty
 
 
 def build_ontology(onto):
@@ -70,6 +70,10 @@ def build_ontology(onto):
             domain = [RoomBooking]
             range = [int]
 
+        # --- Bookkeeping (annotation on the ontology itself) ---
+        # highest Booking_<n> number handed out so far, see ontology/ids.py
+        class lastBookingNumber(AnnotationProperty): pass
+
         # --- Inferred / derived classes (asserted via Python) ---
         class ConflictingBooking(RoomBooking): pass
         class MissingEquipmentBooking(RoomBooking): pass
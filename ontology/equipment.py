@@ -0,0 +1,105 @@
+from typing import Dict, Iterable, List
+
+
+class EquipmentCatalog:
+    """
+    Assigns each Equipment individual one bit and caches an integer mask per room and per
+    activity, so "room has all required equipment" is a single `&` instead of building sets.
+
+    Property names are configurable so the same catalogue works for both ontologies
+    (hasEquipment/requiresEquipment here, has_prerequisite_equipment/has_prerequisite in version2).
+    Masks are cached; call invalidate() after changing a room's or activity's equipment.
+    """
+
+    def __init__(
+        self,
+        equipment: Iterable = (),
+        rooms: Iterable = (),
+        room_prop: str = "hasEquipment",
+        activity_prop: str = "requiresEquipment",
+    ):
+        self.room_prop = room_prop
+        self.activity_prop = activity_prop
+        self._bits: Dict[object, int] = {}
+        self._masks: Dict[object, int] = {}
+        self._rooms_by_mask: Dict[int, List[object]] = {}
+        self._candidates: Dict[int, List[object]] = {}
+        self._room_order: Dict[object, int] = {}
+
+        for eq in equipment:
+            self.bit(eq)
+        for room in rooms:
+            self.add_room(room)
+
+    def bit(self, eq) -> int:
+        b = self._bits.get(eq)
+        if b is None:
+            b = 1 << len(self._bits)
+            self._bits[eq] = b
+        return b
+
+    def mask(self, equipment: Iterable) -> int:
+        m = 0
+        for eq in equipment:
+            m |= self.bit(eq)
+        return m
+
+    def _cached_mask(self, ind, prop: str) -> int:
+        m = self._masks.get(ind)
+        if m is None:
+            m = self.mask(getattr(ind, prop, None) or [])
+            self._masks[ind] = m
+        return m
+
+    def room_mask(self, room) -> int:
+        return self._cached_mask(room, self.room_prop)
+
+    def activity_mask(self, activity) -> int:
+        return self._cached_mask(activity, self.activity_prop)
+
+    def has_all(self, room, activity) -> bool:
+        req = self.activity_mask(activity)
+        return self.room_mask(room) & req == req
+
+    # --- inverted index: equipment mask -> rooms ---
+
+    def add_room(self, room):
+        """
+        Registers a room, or re-reads its equipment if it is already registered.
+        """
+        if room in self._room_order:
+            old = self._masks.pop(room, None)
+            group = self._rooms_by_mask.get(old, [])
+            if room in group:
+                group.remove(room)
+        else:
+            self._room_order[room] = len(self._room_order)
+        self._rooms_by_mask.setdefault(self.room_mask(room), []).append(room)
+        self._candidates.clear()
+
+    def rooms_with(self, req_mask: int) -> List[object]:
+        """
+        Registered rooms whose equipment is a superset of req_mask, in registration order.
+        Rooms are grouped by exact mask, so this only tests each distinct equipment combination once.
+        """
+        found = self._candidates.get(req_mask)
+        if found is None:
+            found = []
+            for room_mask, rooms in self._rooms_by_mask.items():
+                if room_mask & req_mask == req_mask:
+                    found.extend(rooms)
+            found.sort(key=self._room_order.__getitem__)
+            self._candidates[req_mask] = found
+        return found
+
+    def invalidate(self, ind=None):
+        if ind is None:
+            self._masks.clear()
+            self._rooms_by_mask.clear()
+            for room in self._room_order:
+                self._rooms_by_mask.setdefault(self.room_mask(room), []).append(room)
+            self._candidates.clear()
+        elif ind in self._room_order:
+            self.add_room(ind)
+        else:
+            self._masks.pop(ind, None)
@@ -0,0 +1,48 @@
+import re
+import threading
+import types
+
+from owlready2 import AnnotationProperty
+
+MARK_PROPERTY = "lastBookingNumber"
+
+
+class IdAllocator:
+    """
+    Hands out booking names "<prefix><n>" with n strictly increasing, in O(1) per name.
+
+    The high-water mark is stored on the ontology (lastBookingNumber annotation on its metadata),
+    so numbers are never reused after a booking is deleted, across saves and restarts. At startup
+    the mark is also raised past every existing "<prefix><n>" name, which covers ontologies saved
+    before the mark existed. A lock makes allocation safe under concurrent creation, and a name
+    that is somehow already taken is skipped rather than returned.
+    """
+
+    def __init__(self, onto, prefix: str = "Booking_"):
+        self.onto = onto
+        self.prefix = prefix
+        self._lock = threading.Lock()
+
+        self._ensure_mark_property()
+        pattern = re.compile(re.escape(prefix) + r"(\d+)$")
+        highest = max((int(v) for v in getattr(onto.metadata, MARK_PROPERTY, None) or []), default=0)
+        for b in onto.RoomBooking.instances():
+            m = pattern.match(b.name)
+            if m:
+                highest = max(highest, int(m.group(1)))
+        self._last = highest
+
+    def _ensure_mark_property(self):
+        if getattr(self.onto, MARK_PROPERTY, None) is None:
+            # ontology built before the property existed
+            with self.onto:
+                types.new_class(MARK_PROPERTY, (AnnotationProperty,))
+
+    def next_id(self) -> str:
+        with self._lock:
+            n = self._last + 1
+            while self.onto[f"{self.prefix}{n}"] is not None:
+                n += 1
+            self._last = n
+            setattr(self.onto.metadata, MARK_PROPERTY, [n])
+        return f"{self.prefix}{n}"
@@ -0,0 +1,292 @@
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from agents.booking_agent import BookingRequest
+from ontology.reasoning import refresh_room_inferences, update_inferences
+from ontology.timecache import to_minutes
+
+KINDS = ("equipment", "rooms", "courses", "activities", "bookings")
+
+
+@dataclass
+class ImportReport:
+    kind: str
+    rows: int = 0
+    imported: int = 0
+    errors: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float(self.rows)
+
+    def summary(self) -> str:
+        return (
+            f"{self.kind}: {self.imported}/{self.rows} rows imported, {len(self.errors)} errors, "
+            f"{self.seconds:.2f}s ({self.rows_per_second:.0f} rows/s)"
+        )
+
+
+@dataclass
+class BadRow:
+    """
+    A row that couldn't be parsed; it is reported as an error instead of aborting the import.
+    """
+    error: str
+
+
+def read_rows(path) -> Iterator[dict]:
+    """
+    Streams rows from a CSV file (header line) or a JSON Lines file, one dict per row
+    (a BadRow for a line that isn't a JSON object).
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if suffix == ".csv":
+            yield from csv.DictReader(f)
+        elif suffix in (".jsonl", ".ndjson"):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield BadRow(f"invalid JSON: {e.msg} (column {e.colno})")
+                    continue
+                yield row if isinstance(row, dict) else BadRow("expected a JSON object")
+        else:
+            raise ValueError(f"Unsupported file type '{suffix}' (use .csv or .jsonl)")
+
+
+def chunked(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _names(value) -> List[str]:
+    """
+    Equipment lists: JSON arrays, or "A;B" / "A,B" strings in CSV cells.
+    """
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [x.strip() for x in str(value).replace(";", ",").split(",") if x.strip()]
+
+
+def _text(value) -> str:
+    """
+    A cell as a stripped string; JSON Lines values may also be numbers, lists...
+    """
+    return "" if value is None else str(value).strip()
+
+
+def _int_or_none(value) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except TypeError:
+        raise ValueError(f"expected an integer, got {value!r}")
+
+
+class Importer:
+    """
+    Bulk importer for rooms, equipment, courses, activities and booking requests.
+
+    References (equipment, course, activity names) are validated against lookup dictionaries
+    built once per import instead of an onto[name] lookup per row. Booking requests are placed
+    through BookingAgent.create_bookings one chunk at a time.
+    """
+
+    def __init__(self, onto, agent=None, chunk_size: int = 1000):
+        self.onto = onto
+        self.agent = agent
+        self.chunk_size = chunk_size
+        self._lookups: Dict[str, Dict[str, object]] = {}
+
+    def _lookup(self, kind: str) -> Dict[str, object]:
+        if kind not in self._lookups:
+            classes = {
+                "equipment": self.onto.Equipment,
+                "rooms": self.onto.Room,
+                "courses": self.onto.Course,
+                "activities": self.onto.Activity,
+            }
+            self._lookups[kind] = {x.name: x for x in classes[kind].instances()}
+        return self._lookups[kind]
+
+    def _resolve_equipment(self, row: dict, key: str):
+        by_name = self._lookup("equipment")
+        names = _names(row.get(key))
+        missing = [n for n in names if n not in by_name]
+        if missing:
+            raise ValueError(f"unknown equipment {missing}")
+        return [by_name[n] for n in names]
+
+    def import_file(self, kind: str, path) -> ImportReport:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown import kind '{kind}' (expected one of {', '.join(KINDS)})")
+
+        report = ImportReport(kind=kind)
+        handler = getattr(self, f"_import_{kind}")
+        t0 = time.perf_counter()
+
+        with self.onto:
+            for chunk in chunked(enumerate(read_rows(path), 1), self.chunk_size):
+                report.rows += len(chunk)
+                rows = []
+                for n, row in chunk:
+                    if isinstance(row, BadRow):
+                        report.errors.append(f"row {n}: {row.error}")
+                    else:
+                        rows.append((n, row))
+                if rows:
+                    handler(rows, report)
+
+        report.seconds = time.perf_counter() - t0
+        return report
+
+    # --- per-kind handlers: each gets one chunk of (row number, row) pairs ---
+
+    def _import_equipment(self, rows: List[Tuple[int, dict]], report: ImportReport):
+        by_name = self._lookup("equipment")
+        for n, row in rows:
+            name = _text(row.get("name"))
+            if not name:
+                report.errors.append(f"row {n}: missing name")
+                continue
+            if name not in by_name:
+                by_name[name] = self.onto.Equipment(name)
+            report.imported += 1
+
+    def _import_courses(self, rows: List[Tuple[int, dict]], report: ImportReport):
+        by_name = self._lookup("courses")
+        for n, row in rows:
+            name = _text(row.get("name"))
+            if not name:
+                report.errors.append(f"row {n}: missing name")
+                continue
+            if name not in by_name:
+                by_name[name] = self.onto.Course(name)
+            report.imported += 1
+
+    def _import_rooms(self, rows: List[Tuple[int, dict]], report: ImportReport):
+        by_name = self._lookup("rooms")
+        new_rooms = []
+        updated_rooms = []
+        for n, row in rows:
+            name = _text(row.get("name"))
+            try:
+                if not name:
+                    raise ValueError("missing name")
+                capacity = _int_or_none(row.get("capacity"))
+                equipment = self._resolve_equipment(row, "equipment")
+            except ValueError as e:
+                report.errors.append(f"row {n}: {e}")
+                continue
+
+            room = by_name.get(name)
+            if room is None:
+                room = self.onto.Room(name)
+                by_name[name] = room
+                new_rooms.append(room)
+            else:
+                updated_rooms.append(room)
+            room.capacity = capacity
+            room.hasEquipment = equipment
+            report.imported += 1
+
+        if self.agent is not None:
+            self.agent.add_rooms(new_rooms + updated_rooms)
+
+        # bookings in updated rooms may gain/lose capacity/equipment problems; they stay where they were
+        affected = [b for r in updated_rooms for b in self.onto.search(bookingRoom=r)]
+        update_inferences(self.onto, affected, old_rooms=updated_rooms)
+        # new rooms have no bookings yet, they only need classifying (AvailableRoom)
+        for room in new_rooms:
+            refresh_room_inferences(self.onto, room)
+
+    def _import_activities(self, rows: List[Tuple[int, dict]], report: ImportReport):
+        by_name = self._lookup("activities")
+        courses = self._lookup("courses")
+        types = {"lecture": self.onto.Lecture, "exam": self.onto.Exam}
+        updated = []
+        for n, row in rows:
+            name = _text(row.get("name"))
+            try:
+                if not name:
+                    raise ValueError("missing name")
+                cls = types.get((_text(row.get("type")) or "lecture").lower())
+                if cls is None:
+                    raise ValueError(f"unknown activity type '{row.get('type')}'")
+                course_name = _text(row.get("course"))
+                if course_name and course_name not in courses:
+                    raise ValueError(f"unknown course '{course_name}'")
+                attendance = _int_or_none(row.get("attendance"))
+                equipment = self._resolve_equipment(row, "equipment")
+            except ValueError as e:
+                report.errors.append(f"row {n}: {e}")
+                continue
+
+            act = by_name.get(name)
+            if act is None:
+                act = cls(name)
+                by_name[name] = act
+            else:
+                updated.append(act)
+                if self.agent is not None:
+                    self.agent.equipment.invalidate(act)
+            act.belongsToCourse = [courses[course_name]] if course_name else []
+            act.expectedAttendance = attendance
+            act.requiresEquipment = equipment
+            report.imported += 1
+
+        # bookings of updated activities may gain/lose capacity/equipment problems
+        affected = [b for act in updated for b in self.onto.search(bookingOf=act)]
+        if affected:
+            update_inferences(self.onto, affected)
+
+    def _import_bookings(self, rows: List[Tuple[int, dict]], report: ImportReport):
+        if self.agent is None:
+            raise ValueError("Importing bookings needs a BookingAgent")
+
+        activities = self._lookup("activities")
+        requests = []
+        lines = []
+        for n, row in rows:
+            activity = _text(row.get("activity"))
+            try:
+                if activity not in activities:
+                    raise ValueError(f"unknown activity '{activity}'")
+                start = _text(row.get("start"))
+                end = _text(row.get("end"))
+                if not start or not end:
+                    raise ValueError("missing start/end")
+                if to_minutes(end) <= to_minutes(start):
+                    raise ValueError(f"end {end} is not after start {start}")
+                priority = _int_or_none(row.get("priority"))
+            except ValueError as e:
+                report.errors.append(f"row {n}: {e}")
+                continue
+            requests.append(BookingRequest(activity, start, end, 5 if priority is None else priority))
+            lines.append(n)
+
+        results = self.agent.create_bookings(requests, explain_failures=False)
+
+        for n, req, res in zip(lines, requests, results):
+            if res.ok:
+                report.imported += 1
+            else:
+                report.errors.append(f"row {n}: {req.activity_name} {req.start}..{req.end}: {res.message}")
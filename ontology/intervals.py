@@ -0,0 +1,58 @@
+import heapq
+from collections import defaultdict
+
+
+def overlapping_pairs(intervals):
+    """
+    Sweep-line over (start, end, item) tuples; yields every (item_a, item_b) pair whose
+    half-open intervals [start, end) overlap, in O(n log n + k).
+    Empty or inverted intervals (end <= start) never overlap anything and are skipped.
+    """
+    ordered = sorted((t for t in intervals if t[0] < t[1]), key=lambda t: (t[0], t[1]))
+
+    active = []  # heap of (end, seq, item) for intervals still open at the sweep position
+    for seq, (s, e, item) in enumerate(ordered):
+        while active and active[0][0] <= s:
+            heapq.heappop(active)
+        for _, _, other in active:
+            yield other, item
+        heapq.heappush(active, (e, seq, item))
+
+
+def grouped_overlapping_pairs(items, key_of, span_of):
+    """
+    Groups items by key_of(item) (e.g. the booked room) and yields (key, item_a, item_b)
+    for every overlapping pair inside the same group.
+    span_of(item) must return (start, end) or None to skip the item.
+    """
+    groups = defaultdict(list)
+    for item in items:
+        key = key_of(item)
+        if key is None:
+            continue
+        span = span_of(item)
+        if span is None:
+            continue
+        groups[key].append((span[0], span[1], item))
+
+    for key, group in groups.items():
+        for a, b in overlapping_pairs(group):
+            yield key, a, b
+
+
+def overlap_clusters(intervals):
+    """
+    Splits (start, end, item) tuples into clusters: connected groups of intervals that overlap
+    directly or through a chain of other intervals. Items in different clusters never overlap.
+    Returns a list of item lists, in start order.
+    """
+    clusters = []
+    reach = None  # latest end seen in the current cluster
+    for s, e, item in sorted(intervals, key=lambda t: (t[0], t[1])):
+        if reach is None or s >= reach:
+            clusters.append([])
+            reach = e
+        else:
+            reach = max(reach, e)
+        clusters[-1].append(item)
+    return clusters
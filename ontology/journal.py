@@ -0,0 +1,129 @@
+import json
+import os
+from pathlib import Path
+from typing import Callable, Optional
+
+from ontology.timecache import set_booking_times
+
+
+class BookingJournal:
+    """
+    Append-only JSON Lines journal of booking mutations (create / move).
+
+    Every record is flushed and fsynced before the call returns, so a crash loses at most the
+    operation in flight. On startup, replay() re-applies the records on top of the last snapshot.
+    Once `snapshot_every` records have accumulated, checkpoint() compacts: it writes a full
+    snapshot through the `snapshot` callable and truncates the journal.
+
+    Only bookings are journaled: anything else (rooms, activities, ...) must be in a snapshot
+    before bookings that refer to it are recorded, so call compact() after creating it.
+    """
+
+    def __init__(self, path, snapshot: Optional[Callable[[], None]] = None, snapshot_every: int = 500):
+        self.path = Path(path)
+        self.snapshot = snapshot
+        self.snapshot_every = snapshot_every
+        self.pending = 0
+        self._f = None
+
+    def _file(self):
+        if self._f is None:
+            self._f = open(self.path, "a", encoding="utf-8")
+        return self._f
+
+    def _append(self, record: dict):
+        f = self._file()
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+        self.pending += 1
+
+    def record_create(self, booking):
+        self._append({
+            "op": "create",
+            "id": booking.name,
+            "room": booking.bookingRoom.name if booking.bookingRoom else None,
+            "activity": booking.bookingOf.name if booking.bookingOf else None,
+            "start": booking.start,
+            "end": booking.end,
+            "priority": booking.priority,
+        })
+
+    def record_move(self, booking):
+        self._append({
+            "op": "move",
+            "id": booking.name,
+            "room": booking.bookingRoom.name if booking.bookingRoom else None,
+            "start": booking.start,
+            "end": booking.end,
+        })
+
+    def replay(self, onto) -> int:
+        """
+        Re-applies journaled operations to onto. Records are idempotent, so replaying a journal
+        whose operations are already in the snapshot is harmless. A torn last line is ignored.
+        """
+        if not self.path.exists():
+            return 0
+
+        applied = 0
+        good_bytes = 0
+        with open(self.path, "rb") as f:
+            lines = f.readlines()
+
+        with onto:
+            for line in lines:
+                if not line.endswith(b"\n"):
+                    break  # incomplete write from a crash: it was never acknowledged
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                good_bytes += len(line)
+
+                if rec["op"] == "create":
+                    b = onto.RoomBooking(rec["id"])
+                    b.bookingOf = onto[rec["activity"]] if rec.get("activity") else None
+                    b.priority = rec.get("priority")
+                elif rec["op"] == "move":
+                    b = onto[rec["id"]]
+                    if b is None:
+                        continue
+                else:
+                    continue
+
+                b.bookingRoom = onto[rec["room"]] if rec.get("room") else None
+                set_booking_times(b, rec["start"], rec["end"])
+                applied += 1
+
+        # Drop a torn tail so new records are not appended after garbage
+        if good_bytes < sum(len(line) for line in lines):
+            with open(self.path, "r+b") as f:
+                f.truncate(good_bytes)
+                os.fsync(f.fileno())
+
+        self.pending = applied
+        return applied
+
+    def checkpoint(self):
+        """
+        Compacts the journal into a snapshot once enough operations have accumulated.
+        """
+        if self.snapshot is not None and self.pending >= self.snapshot_every:
+            self.compact()
+
+    def compact(self):
+        """
+        Writes a full snapshot, then truncates the journal (the snapshot now holds every operation).
+        """
+        self.snapshot()
+        self.close()
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.pending = 0
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
@@ -1,12 +1,6 @@
-from datetime import datetime
-
-
-def parse_iso(dt: str) -> datetime:
-    return datetime.fromisoformat(dt)
-
-
-def overlaps(a_start, a_end, b_start, b_end) -> bool:
-    return a_start < b_end and b_start < a_end
+from ontology.availability import AvailabilityIndex
+from ontology.equipment import EquipmentCatalog
+from ontology.timecache import to_minutes
 
 
 def list_rooms(onto):
@@ -53,51 +47,41 @@ def available_between(
     end_iso: str,
     min_capacity: int | None = None,
     required_equipment: list[str] | None = None,
+    *,
+    index: AvailabilityIndex | None = None,
+    equipment: EquipmentCatalog | None = None,
 ):
     """
     Returns rooms that are free between [start_iso, end_iso), optionally filtering by:
       - min_capacity
       - required equipment names (e.g. ["Projector", "Computers"])
-    """
-    start_dt = parse_iso(start_iso)
-    end_dt = parse_iso(end_iso)
 
-    # Pre-resolve equipment objects by name (if requested)
-    req_eq_objs = []
+    Pass the BookingAgent's live AvailabilityIndex and EquipmentCatalog when there is one;
+    without them they are built from the ontology for this query (a full scan).
+    """
+    start_min = to_minutes(start_iso)
+    end_min = to_minutes(end_iso)
+    if index is None:
+        index = AvailabilityIndex(onto)
+    if equipment is None:
+        equipment = EquipmentCatalog(onto.Equipment.instances(), onto.Room.instances())
+
+    # Pre-resolve equipment objects by name (if requested); rooms come from the mask index
+    rooms = onto.Room.instances()
     if required_equipment:
         by_name = {e.name: e for e in onto.Equipment.instances()}
-        for name in required_equipment:
-            if name in by_name:
-                req_eq_objs.append(by_name[name])
+        req_mask = equipment.mask(by_name[name] for name in required_equipment if name in by_name)
+        rooms = equipment.rooms_with(req_mask)
 
     free_rooms = []
-    for r in onto.Room.instances():
+    for r in rooms:
         # capacity filter
         cap = getattr(r, "capacity", None)
         if min_capacity is not None and cap is not None and cap < min_capacity:
             continue
 
-        # equipment filter
-        if req_eq_objs:
-            room_eq = set(getattr(r, "hasEquipment", []))
-            if not set(req_eq_objs).issubset(room_eq):
-                continue
-
         # temporal availability filter
-        is_free = True
-        for b in onto.RoomBooking.instances():
-            if not b.bookingRoom or not b.start or not b.end:
-                continue
-            if b.bookingRoom != r:
-                continue
-
-            bs = parse_iso(b.start)
-            be = parse_iso(b.end)
-            if overlaps(start_dt, end_dt, bs, be):
-                is_free = False
-                break
-
-        if is_free:
+        if index.is_free(r, start_min, end_min):
             free_rooms.append(r)
 
     return free_rooms
@@ -109,6 +93,10 @@ def print_available_between(
     end_iso: str,
     min_capacity: int | None = None,
     required_equipment: list[str] | None = None,
+    *,
+    index: AvailabilityIndex | None = None,
+    equipment: EquipmentCatalog | None = None,
 ):
-    rooms = available_between(onto, start_iso, end_iso, min_capacity, required_equipment)
+    rooms = available_between(onto, start_iso, end_iso, min_capacity, required_equipment,
+                              index=index, equipment=equipment)
     print("Available rooms:", [r.name for r in rooms])
@@ -1,5 +1,8 @@
 from datetime import datetime
 
+from ontology.intervals import grouped_overlapping_pairs
+from ontology.timecache import booking_minutes
+
 
 def parse_iso(dt: str) -> datetime:
     return datetime.fromisoformat(dt)
@@ -9,6 +12,55 @@ def overlaps(a_start, a_end, b_start, b_end) -> bool:
     return a_start < b_end and b_start < a_end
 
 
+def booking_span(b):
+    """
+    Returns cached (start, end) epoch-minutes of a booking, or None if missing/unparsable.
+    """
+    return booking_minutes(b)
+
+
+def find_conflict_pairs(onto, bookings=None):
+    """
+    Returns (room, b1, b2) for every pair of bookings in the same room with overlapping times.
+    Uses a per-room sweep-line instead of comparing every pair of bookings.
+    """
+    if bookings is None:
+        bookings = onto.RoomBooking.instances()
+    return list(grouped_overlapping_pairs(
+        bookings,
+        key_of=lambda b: getattr(b, "bookingRoom", None),
+        span_of=booking_span,
+    ))
+
+
+def _fit_problems(b):
+    """
+    Returns (under_capacity, missing_equipment) for a booking's room/activity pair.
+    """
+    if not getattr(b, "bookingRoom", None) or not getattr(b, "bookingOf", None):
+        return False, False
+
+    room = b.bookingRoom
+    act = b.bookingOf
+
+    cap = getattr(room, "capacity", None)
+    exp = getattr(act, "expectedAttendance", None)
+    under_capacity = cap is not None and exp is not None and cap < exp
+
+    room_eq = set(getattr(room, "hasEquipment", []))
+    req_eq = set(getattr(act, "requiresEquipment", []))
+    missing_equipment = bool(req_eq) and not req_eq.issubset(room_eq)
+
+    return under_capacity, missing_equipment
+
+
+def _set_inferred(ind, cls, flag: bool):
+    if flag and cls not in ind.is_a:
+        ind.is_a.append(cls)
+    elif not flag and cls in ind.is_a:
+        ind.is_a.remove(cls)
+
+
 def refresh_inferences(onto):
     """
     Recomputes inferred classes by scanning bookings and asserting class membership.
@@ -29,65 +81,71 @@ def refresh_inferences(onto):
 
     # 2) Equipment + capacity checks
     for b in onto.RoomBooking.instances():
-        if not getattr(b, "bookingRoom", None) or not getattr(b, "bookingOf", None):
-            continue
+        under_capacity, missing_equipment = _fit_problems(b)
+        if under_capacity and UnderCapacityBooking not in b.is_a:
+            b.is_a.append(UnderCapacityBooking)
+        if missing_equipment and MissingEquipmentBooking not in b.is_a:
+            b.is_a.append(MissingEquipmentBooking)
 
-        room = b.bookingRoom
-        act = b.bookingOf
+    # 3) Time conflicts
+    conflict_rooms = set()
 
-        cap = getattr(room, "capacity", None)
-        exp = getattr(act, "expectedAttendance", None)
-        if cap is not None and exp is not None and cap < exp:
-            if UnderCapacityBooking not in b.is_a:
-                b.is_a.append(UnderCapacityBooking)
+    for room, b1, b2 in find_conflict_pairs(onto):
+        if ConflictingBooking not in b1.is_a:
+            b1.is_a.append(ConflictingBooking)
+        if ConflictingBooking not in b2.is_a:
+            b2.is_a.append(ConflictingBooking)
 
-        room_eq = set(getattr(room, "hasEquipment", []))
-        req_eq = set(getattr(act, "requiresEquipment", []))
-        if req_eq and not req_eq.issubset(room_eq):
-            if MissingEquipmentBooking not in b.is_a:
-                b.is_a.append(MissingEquipmentBooking)
+        conflict_rooms.add(room)
 
-    # 3) Time conflicts
-    bookings = list(onto.RoomBooking.instances())
-    conflict_rooms = set()
+    # 4) Rooms: OverBookedRoom vs AvailableRoom
+    for r in onto.Room.instances():
+        if r in conflict_rooms:
+            r.is_a.append(OverBookedRoom)
+        else:
+            r.is_a.append(AvailableRoom)
+
+
+def refresh_room_inferences(onto, room):
+    """
+    Recomputes ConflictingBooking for the bookings of one room and OverBookedRoom/AvailableRoom
+    for the room itself. Only that room's bookings are looked at.
+    """
+    bookings = list(onto.search(bookingRoom=room))
+    conflicting = set()
+    for _, b1, b2 in find_conflict_pairs(onto, bookings):
+        conflicting.add(b1)
+        conflicting.add(b2)
 
-    for i in range(len(bookings)):
-        b1 = bookings[i]
-        if not getattr(b1, "bookingRoom", None) or not getattr(b1, "start", None) or not getattr(b1, "end", None):
-            continue
+    for b in bookings:
+        _set_inferred(b, onto.ConflictingBooking, b in conflicting)
 
-        try:
-            s1 = parse_iso(b1.start)
-            e1 = parse_iso(b1.end)
-        except Exception:
-            continue
+    _set_inferred(room, onto.OverBookedRoom, bool(conflicting))
+    _set_inferred(room, onto.AvailableRoom, not conflicting)
 
-        r1 = b1.bookingRoom
 
-        for j in range(i + 1, len(bookings)):
-            b2 = bookings[j]
-            if not getattr(b2, "bookingRoom", None) or not getattr(b2, "start", None) or not getattr(b2, "end", None):
-                continue
-            if b2.bookingRoom != r1:
-                continue
+def update_inferences(onto, bookings=(), old_rooms=()):
+    """
+    Incremental counterpart of refresh_inferences for added, moved or deleted bookings.
 
-            try:
-                s2 = parse_iso(b2.start)
-                e2 = parse_iso(b2.end)
-            except Exception:
-                continue
+    - bookings: bookings that were added or changed (deleted ones are simply left out)
+    - old_rooms: rooms those bookings were in before the change (moved/deleted bookings)
 
-            if overlaps(s1, e1, s2, e2):
-                if ConflictingBooking not in b1.is_a:
-                    b1.is_a.append(ConflictingBooking)
-                if ConflictingBooking not in b2.is_a:
-                    b2.is_a.append(ConflictingBooking)
+    Only the given bookings and the affected rooms (with their overlapping neighbours) are
+    recomputed, each room once; everything else keeps its current inferred classes.
+    """
+    rooms = {r for r in old_rooms if r is not None}
 
-                conflict_rooms.add(r1)
+    for booking in bookings:
+        under_capacity, missing_equipment = _fit_problems(booking)
+        _set_inferred(booking, onto.UnderCapacityBooking, under_capacity)
+        _set_inferred(booking, onto.MissingEquipmentBooking, missing_equipment)
 
-    # 4) Rooms: OverBookedRoom vs AvailableRoom
-    for r in onto.Room.instances():
-        if r in conflict_rooms:
-            r.is_a.append(OverBookedRoom)
+        room = getattr(booking, "bookingRoom", None)
+        if room is not None:
+            rooms.add(room)
         else:
-            r.is_a.append(AvailableRoom)
+            _set_inferred(booking, onto.ConflictingBooking, False)
+
+    for room in rooms:
+        refresh_room_inferences(onto, room)
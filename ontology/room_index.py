@@ -0,0 +1,54 @@
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from ontology.equipment import EquipmentCatalog
+
+_NO_CAPACITY = float("inf")  # rooms without a capacity never fail the capacity test
+
+
+class RoomIndex:
+    """
+    Rooms in best-fit order (capacity ascending, then more equipment first), per equipment mask.
+
+    For a required equipment mask the equipped rooms come from the catalogue's inverted index
+    and are sorted once; a request then bisects on capacity and the remaining rooms are already
+    in best-fit order, so no per-request scan or sort is needed.
+    """
+
+    def __init__(self, catalog: EquipmentCatalog, capacity_prop: str = "capacity"):
+        self.catalog = catalog
+        self.capacity_prop = capacity_prop
+        self._by_mask: Dict[int, Tuple[List[float], List[object]]] = {}
+
+    def _capacity(self, room) -> float:
+        cap = getattr(room, self.capacity_prop, None)
+        return _NO_CAPACITY if cap is None else cap
+
+    def _sorted_for(self, req_mask: int) -> Tuple[List[float], List[object]]:
+        entry = self._by_mask.get(req_mask)
+        if entry is None:
+            rooms = sorted(
+                self.catalog.rooms_with(req_mask),
+                key=lambda r: (self._capacity(r), -self.catalog.room_mask(r).bit_count()),
+            )
+            entry = ([self._capacity(r) for r in rooms], rooms)
+            self._by_mask[req_mask] = entry
+        return entry
+
+    def candidates(self, min_capacity: Optional[int], req_mask: int = 0) -> List[object]:
+        """
+        Rooms with capacity >= min_capacity and equipment covering req_mask, best fit first.
+        """
+        capacities, rooms = self._sorted_for(req_mask)
+        if min_capacity is None:
+            return rooms
+        return rooms[bisect_left(capacities, min_capacity):]
+
+    def for_activity(self, activity, attendance_prop: str = "expectedAttendance") -> List[object]:
+        return self.candidates(getattr(activity, attendance_prop, None), self.catalog.activity_mask(activity))
+
+    def invalidate(self):
+        """
+        Call after adding rooms or changing a room's capacity/equipment.
+        """
+        self._by_mask.clear()
@@ -0,0 +1,99 @@
+import heapq
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+from typing import FrozenSet, Iterable, Iterator, Optional, Tuple
+
+from ontology.timecache import booking_minutes, to_minutes
+
+
+# the fixed two-hour slots the agents have always tried repairs in, in the order they try them
+REPAIR_SLOTS = (
+    ("2026-01-05T08:00", "2026-01-05T10:00"),
+    ("2026-01-05T13:00", "2026-01-05T15:00"),
+    ("2026-01-05T15:00", "2026-01-05T17:00"),
+    ("2026-01-06T10:00", "2026-01-06T12:00"),
+)
+
+
+@dataclass(frozen=True)
+class SlotCalendar:
+    """
+    Calendar that candidate slots for moving a booking are generated from: term dates, daily
+    opening hours, slot length, bookable weekdays and blackout days (holidays, exam breaks...).
+
+    Slots start at opening time and repeat every slot_minutes. Free slots are read straight
+    from a room's busy intervals: when a slot is taken, the search jumps past the blocking
+    bookings to the next slot boundary instead of testing every slot in between.
+
+    If `slots` is given (earliest first), only those ("start", "end") ISO pairs are candidates,
+    whatever the booking's duration; the grid fields are then not used.
+    """
+
+    term_start: date = date(2026, 1, 5)
+    term_end: date = date(2026, 1, 9)
+    opening: time = time(8, 0)
+    closing: time = time(18, 0)
+    slot_minutes: int = 120
+    weekdays: FrozenSet[int] = frozenset(range(5))  # Monday..Friday
+    blackout_days: FrozenSet[date] = frozenset()
+    slots: Optional[Tuple[Tuple[str, str], ...]] = None
+
+    def days(self) -> Iterator[date]:
+        day = self.term_start
+        while day <= self.term_end:
+            if day.weekday() in self.weekdays and day not in self.blackout_days:
+                yield day
+            day += timedelta(days=1)
+
+    def _day_bounds(self, day: date) -> Tuple[int, int]:
+        midnight = to_minutes(day.isoformat())
+        return (
+            midnight + self.opening.hour * 60 + self.opening.minute,
+            midnight + self.closing.hour * 60 + self.closing.minute,
+        )
+
+    def free_slots(self, availability, room, duration: Optional[int] = None,
+                   ignore_booking=None) -> Iterator[Tuple[int, int]]:
+        """
+        Lazily yields (start, end) epoch-minute slots in which room is free, earliest first.
+        duration defaults to slot_minutes; bookings equal to ignore_booking don't count as busy.
+        """
+        if self.slots is not None:
+            for start_iso, end_iso in self.slots:
+                start, end = to_minutes(start_iso), to_minutes(end_iso)
+                if all(b == ignore_booking for b in availability.bookings_in(room, start, end)):
+                    yield start, end
+            return
+
+        length = duration or self.slot_minutes
+        step = self.slot_minutes
+        for day in self.days():
+            open_at, close_at = self._day_bounds(day)
+            t = open_at
+            while t + length <= close_at:
+                busy = [b for b in availability.bookings_in(room, t, t + length) if b != ignore_booking]
+                if not busy:
+                    yield t, t + length
+                    t += step
+                    continue
+                # first slot boundary at or after the end of the blocking bookings
+                busy_until = max(booking_minutes(b)[1] for b in busy)
+                t = open_at + -(-(busy_until - open_at) // step) * step
+
+    def free_slots_in(self, availability, rooms: Iterable, duration: Optional[int] = None,
+                      ignore_booking=None) -> Iterator[Tuple[int, int, object]]:
+        """
+        Lazily yields free (start, end, room) over several rooms: earliest slot first and, for
+        the same start, rooms in the order given (e.g. best fit first).
+        """
+        def tagged(rank, room):
+            for start, end in self.free_slots(availability, room, duration, ignore_booking):
+                yield start, rank, end, room
+
+        streams = [tagged(rank, room) for rank, room in enumerate(rooms)]
+        for start, _, end, room in heapq.merge(*streams):
+            yield start, end, room
+
+
+# what the agents use when no calendar is passed; main.py --slot-grid builds a SlotCalendar() grid instead
+DEFAULT_CALENDAR = SlotCalendar(slots=REPAIR_SLOTS)
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+_EPOCH = datetime(1970, 1, 1)
+_MINUTE = timedelta(minutes=1)
+
+
+@lru_cache(maxsize=4096)
+def to_minutes(iso: str) -> int:
+    """
+    Converts an ISO timestamp to integer minutes since the epoch (naive/local wall time).
+    """
+    dt = datetime.fromisoformat(iso)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // _MINUTE
+
+
+def to_iso(minutes: int) -> str:
+    """
+    Inverse of to_minutes: "YYYY-MM-DDTHH:MM" for epoch minutes.
+    """
+    return (_EPOCH + minutes * _MINUTE).isoformat(timespec="minutes")
+
+
+class TimestampCache:
+    """
+    Parsed (start, end) epoch-minutes per RoomBooking, so hot paths don't read and re-parse the
+    owlready2 string properties on every comparison.
+
+    A lookup is a dict hit and never touches the individual; only a miss reads start/end.
+    set_times stores the parsed span as it writes the strings. Anything else that assigns
+    start/end (e.g. a transaction rollback) must call invalidate(booking).
+    """
+
+    def __init__(self):
+        self._spans: Dict[object, Optional[Tuple[int, int]]] = {}
+
+    @staticmethod
+    def _parse(start, end) -> Optional[Tuple[int, int]]:
+        if not start or not end:
+            return None
+        try:
+            return to_minutes(start), to_minutes(end)
+        except (TypeError, ValueError):
+            return None
+
+    def span(self, booking) -> Optional[Tuple[int, int]]:
+        try:
+            return self._spans[booking]
+        except KeyError:
+            span = self._parse(getattr(booking, "start", None), getattr(booking, "end", None))
+            self._spans[booking] = span
+            return span
+
+    def set_times(self, booking, start_iso: str, end_iso: str):
+        booking.start = start_iso
+        booking.end = end_iso
+        self._spans[booking] = self._parse(start_iso, end_iso)
+
+    def invalidate(self, booking=None):
+        if booking is None:
+            self._spans.clear()
+        else:
+            self._spans.pop(booking, None)
+
+
+_cache = TimestampCache()
+
+
+def booking_minutes(booking) -> Optional[Tuple[int, int]]:
+    """
+    Returns the cached (start, end) epoch-minutes of a booking, or None if missing/unparsable.
+    """
+    return _cache.span(booking)
+
+
+def set_booking_times(booking, start_iso: str, end_iso: str):
+    """
+    Assigns start/end on a booking and caches their parsed span.
+    """
+    _cache.set_times(booking, start_iso, end_iso)
+
+
+def invalidate(booking=None):
+    """
+    Drops the cached span of booking (of every booking if None); call after assigning start/end
+    directly instead of through set_booking_times.
+    """
+    _cache.invalidate(booking)
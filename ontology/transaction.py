@@ -0,0 +1,102 @@
+from typing import Callable, List, Optional
+
+from owlready2 import destroy_entity
+
+
+class Transaction:
+    """
+    Undo log over ontology changes, used as a context manager:
+
+        with Transaction(on_commit=..., on_undo=...) as tx:
+            tx.set(booking, "bookingRoom", room)
+            ...
+
+    Attribute changes (set/record), created individuals (created) and arbitrary inverse
+    operations (add_undo) are logged as they happen. Leaving the block normally commits;
+    an exception rolls everything back in reverse order and is re-raised. savepoint() and
+    rollback_to() undo only part of the work, e.g. one failed branch of a what-if search.
+
+    on_commit(touched, created) runs once at commit; on_undo(touched, created) runs after each
+    rollback with the individuals whose changes were undone, so callers can resync their
+    indexes from the restored state instead of re-scanning the ontology.
+    """
+
+    def __init__(self, on_commit: Optional[Callable] = None, on_undo: Optional[Callable] = None):
+        self.on_commit = on_commit
+        self.on_undo = on_undo
+        self.active = True
+        self._log: List[tuple] = []  # ("set", ind, attr, old) | ("create", ind) | ("undo", fn)
+
+    def record(self, ind, attr: str):
+        """
+        Logs the current value of ind.attr; call before changing it.
+        """
+        old = getattr(ind, attr, None)
+        if isinstance(old, list):
+            old = list(old)
+        self._log.append(("set", ind, attr, old))
+
+    def set(self, ind, attr: str, value):
+        self.record(ind, attr)
+        setattr(ind, attr, value)
+
+    def created(self, ind):
+        self._log.append(("create", ind))
+
+    def add_undo(self, fn: Callable[[], None]):
+        self._log.append(("undo", fn))
+
+    def savepoint(self) -> int:
+        return len(self._log)
+
+    def _split(self, entries):
+        touched, created = {}, {}
+        for entry in entries:
+            if entry[0] == "create":
+                created[entry[1]] = None
+            elif entry[0] == "set":
+                touched[entry[1]] = None
+        return [ind for ind in touched if ind not in created], list(created)
+
+    def touched(self) -> List[object]:
+        """
+        Individuals changed (not created) so far, in first-change order.
+        """
+        return self._split(self._log)[0]
+
+    def rollback_to(self, mark: int):
+        undone = self._log[mark:]
+        del self._log[mark:]
+        for entry in reversed(undone):
+            if entry[0] == "set":
+                _, ind, attr, old = entry
+                setattr(ind, attr, old)
+            elif entry[0] == "create":
+                destroy_entity(entry[1])
+            else:
+                entry[1]()
+        if undone and self.on_undo is not None:
+            self.on_undo(*self._split(undone))
+
+    def rollback(self):
+        self.rollback_to(0)
+        self.active = False
+
+    def commit(self):
+        touched, created = self._split(self._log)
+        self._log = []
+        self.active = False
+        if self.on_commit is not None:
+            self.on_commit(touched, created)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.active:
+            return False
+        if exc_type is not None:
+            self.rollback()
+        else:
+            self.commit()
+        return False
@@ -0,0 +1,108 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from unified_planning.engines.results import POSITIVE_OUTCOMES, PlanGenerationResult, PlanGenerationResultStatus
+from unified_planning.shortcuts import get_environment
+
+from portfolio import NATIVE, is_valid_plan, rebuild_plan, solve_with
+from reduction import restrict_problem
+from timetabler import exam_domains
+
+
+@dataclass
+class PartRun:
+    exams: int
+    slots: List[str]
+    status: str = "PENDING"
+    wall_time: Optional[float] = None
+    error: Optional[str] = None
+
+
+def independent_parts(options: Dict[object, list]) -> List[List[object]]:
+    """
+    Groups exams that can compete for a (room, slot) or a (group, slot), directly or through
+    other exams (union-find). Seasons never share slots, so they always end up apart; within a
+    season, exams whose rooms or groups never meet are split further.
+    """
+    parent = {e: e for e in options}
+
+    def find(e):
+        while parent[e] != e:
+            parent[e] = parent[parent[e]]
+            e = parent[e]
+        return e
+
+    holder = {}
+    for e, values in options.items():
+        for r, s, g in values:
+            for key in (("room", r, s), ("group", g, s)):
+                other = holder.setdefault(key, e)
+                parent[find(other)] = find(e)
+
+    parts = {}
+    for e in options:
+        parts.setdefault(find(e), []).append(e)
+    return sorted(parts.values(), key=len, reverse=True)
+
+
+def _solve_part(loader: Callable, loader_args: tuple, exam_names: List[str], engine: str,
+                timeout: Optional[float]):
+    """
+    Worker process: rebuilds the problem, keeps only this part's exams and solves them.
+    """
+    get_environment().credits_stream = None
+    start = time.monotonic()
+    try:
+        problem = loader(*loader_args)
+        names = set(exam_names)
+        options = {e: values for e, values in exam_domains(problem).items() if str(e) in names}
+        result = solve_with(engine, restrict_problem(problem, options, f"{problem.name}_part"), timeout)
+        actions = None
+        if result.status in POSITIVE_OUTCOMES and result.plan is not None:
+            actions = [(a.action.name, tuple(str(p) for p in a.actual_parameters)) for a in result.plan.actions]
+        return result.status.name, actions, time.monotonic() - start, None
+    except Exception as exc:
+        return "ERROR", None, time.monotonic() - start, repr(exc)
+
+
+def solve_decomposed(problem, loader: Callable, loader_args: tuple = (), engine: str = NATIVE,
+                     timeout: Optional[float] = None, max_workers: Optional[int] = None):
+    """
+    Splits the problem into independent_parts and solves them in a process pool with engine,
+    so the run takes about as long as the hardest part. The partial plans are concatenated and
+    validated against the whole problem.
+
+    loader(*loader_args) must rebuild the same problem in the workers. Returns (result, parts):
+    a PlanGenerationResult (plan None unless every part was solved) and one PartRun per part.
+    """
+    name = f"decomposed:{engine}"
+    options = exam_domains(problem)
+    groups = independent_parts(options)
+    parts = [PartRun(len(exams), sorted({str(v[1]) for e in exams for v in options[e]})) for exams in groups]
+    if not groups:
+        return PlanGenerationResult(PlanGenerationResultStatus.SOLVED_SATISFICING, rebuild_plan(problem, []), name), parts
+
+    workers = max_workers or min(len(groups), os.cpu_count() or 1)
+    actions, statuses = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_solve_part, loader, loader_args, [str(e) for e in exams], engine, timeout)
+                   for exams in groups]
+        for part, future in zip(parts, futures):
+            part.status, part_actions, part.wall_time, part.error = future.result()
+            statuses.append(part.status)
+            if part_actions is not None:
+                actions.extend(part_actions)
+
+    if any(status not in {s.name for s in POSITIVE_OUTCOMES} for status in statuses):
+        for status in ("UNSOLVABLE_PROVEN", "TIMEOUT", "UNSOLVABLE_INCOMPLETELY"):
+            if status in statuses:
+                return PlanGenerationResult(PlanGenerationResultStatus[status], None, name), parts
+        return PlanGenerationResult(PlanGenerationResultStatus.INTERNAL_ERROR, None, name), parts
+
+    plan = rebuild_plan(problem, actions)
+    if not is_valid_plan(problem, plan):
+        return PlanGenerationResult(PlanGenerationResultStatus.INTERNAL_ERROR, None, name), parts
+    return PlanGenerationResult(PlanGenerationResultStatus.SOLVED_SATISFICING, plan, name), parts
@@ -0,0 +1,127 @@
+import multiprocessing
+import queue
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from unified_planning.engines.results import (
+    POSITIVE_OUTCOMES, PlanGenerationResult, PlanGenerationResultStatus, ValidationResultStatus,
+)
+from unified_planning.plans import ActionInstance, SequentialPlan
+from unified_planning.shortcuts import OneshotPlanner, PlanValidator, get_environment
+
+import timetabler
+
+NATIVE = "native"
+DEFAULT_ENGINES = (NATIVE, "pyperplan")  # the engines requirements.txt installs; add others with --portfolio-engines
+POLL_INTERVAL = 0.1  # seconds between checks for crashed engines
+
+
+@dataclass
+class EngineRun:
+    engine: str
+    status: str = "RUNNING"
+    wall_time: Optional[float] = None
+    error: Optional[str] = None
+
+
+def solve_with(engine: str, problem, timeout: Optional[float] = None) -> PlanGenerationResult:
+    if engine == NATIVE:
+        return timetabler.solve(problem, timeout)
+    with OneshotPlanner(problem_kind=problem.kind, name=engine) as planner:
+        return planner.solve(problem, timeout=timeout)
+
+
+def _run_engine(engine: str, loader: Callable, loader_args: tuple, timeout: Optional[float], results):
+    """
+    Child process: rebuilds the problem (UP problems don't pickle reliably), solves it and sends
+    back the status and the plan as (action name, parameter names) pairs.
+    """
+    get_environment().credits_stream = None
+    try:
+        result = solve_with(engine, loader(*loader_args), timeout)
+        actions = None
+        if result.status in POSITIVE_OUTCOMES and result.plan is not None:
+            actions = [(a.action.name, tuple(str(p) for p in a.actual_parameters)) for a in result.plan.actions]
+        results.put((engine, result.status.name, actions, None))
+    except Exception as exc:
+        results.put((engine, "ERROR", None, repr(exc)))
+
+
+def rebuild_plan(problem, actions: List[Tuple[str, tuple]]) -> SequentialPlan:
+    return SequentialPlan([
+        ActionInstance(problem.action(name), tuple(problem.object(p) for p in params))
+        for name, params in actions
+    ])
+
+
+def is_valid_plan(problem, plan) -> bool:
+    with PlanValidator(problem_kind=problem.kind, plan_kind=plan.kind) as validator:
+        return validator.validate(problem, plan).status == ValidationResultStatus.VALID
+
+
+def run_portfolio(problem, loader: Callable, loader_args: tuple = (),
+                  engines: Sequence[str] = DEFAULT_ENGINES,
+                  timeouts: Optional[Dict[str, float]] = None, default_timeout: Optional[float] = None):
+    """
+    Runs every engine on the problem in its own process; the first plan that validates against
+    problem wins and the other engines are killed. An engine still running after its timeout
+    (timeouts[engine], else default_timeout) is killed as well.
+
+    loader(*loader_args) must rebuild the same problem in the child processes. Returns
+    (result, runs): the winning PlanGenerationResult (None if no engine found a valid plan)
+    and one EngineRun per engine with its final status and wall time.
+    """
+    timeouts = timeouts or {}
+    limit = {engine: timeouts.get(engine, default_timeout) for engine in engines}
+    runs = {engine: EngineRun(engine) for engine in engines}
+    results = multiprocessing.Queue()
+    procs, started = {}, {}
+
+    for engine in engines:
+        proc = multiprocessing.Process(target=_run_engine, daemon=True,
+                                       args=(engine, loader, loader_args, limit[engine], results))
+        started[engine] = time.monotonic()
+        proc.start()
+        procs[engine] = proc
+
+    def finish(engine, status, error=None):
+        runs[engine].status = status
+        runs[engine].wall_time = time.monotonic() - started[engine]
+        runs[engine].error = error
+        pending.discard(engine)
+
+    pending = set(engines)
+    winner = None
+    while pending and winner is None:
+        now = time.monotonic()
+        for engine in list(pending):
+            if limit[engine] is not None and now - started[engine] > limit[engine]:
+                procs[engine].kill()
+                finish(engine, "TIMEOUT")
+            elif not procs[engine].is_alive() and procs[engine].exitcode not in (0, None):
+                finish(engine, "CRASHED", f"exit code {procs[engine].exitcode}")
+        if not pending:
+            break
+
+        try:
+            engine, status, actions, error = results.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            continue
+        if engine not in pending:
+            continue
+        finish(engine, status, error)
+        if actions is not None:
+            plan = rebuild_plan(problem, actions)
+            if is_valid_plan(problem, plan):
+                winner = PlanGenerationResult(PlanGenerationResultStatus[status], plan, engine)
+            else:
+                runs[engine].status = "INVALID_PLAN"
+
+    for engine in list(pending):
+        procs[engine].kill()
+        finish(engine, "KILLED")
+    for proc in procs.values():
+        proc.join()
+
+    return winner, [runs[engine] for engine in engines]
@@ -0,0 +1,165 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from unified_planning.io import PDDLWriter
+from unified_planning.shortcuts import BoolType, Fluent, InstantaneousAction, Object, Problem, UserType
+
+# Exam periods and their slots; exams of a season may only use that season's slots (period_ok)
+DEFAULT_SEASON_SLOTS = {
+    "normal": ["N1", "N2", "N3", "N4", "N5", "N6"],
+    "resit": ["R1", "R2", "R3", "R4", "R5", "R6"],
+}
+
+
+@dataclass
+class ExamInfo:
+    name: str
+    attendance: Optional[int]
+    group: str  # exams of the same group can't share a slot
+    season: str
+    equipment: frozenset = frozenset()
+
+
+@dataclass
+class RoomInfo:
+    name: str
+    capacity: Optional[int]
+    equipment: frozenset = frozenset()
+
+
+def default_season(exam) -> str:
+    """
+    Resit exams are recognised by name ("r_..." or containing "resit"); everything else is normal.
+    """
+    name = exam.name.lower()
+    return "resit" if name.startswith("r_") or "resit" in name else "normal"
+
+
+def pddl_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]", "_", name)
+
+
+def exams_and_rooms(onto, season_of: Callable = default_season):
+    """
+    Reads Exam (expectedAttendance, belongsToCourse, requiresEquipment) and Room (capacity,
+    hasEquipment) individuals. An exam's group is its first course, or the exam itself.
+    """
+    exams = []
+    for exam in onto.Exam.instances():
+        courses = list(getattr(exam, "belongsToCourse", []) or [])
+        exams.append(ExamInfo(
+            name=exam.name,
+            attendance=getattr(exam, "expectedAttendance", None),
+            group=courses[0].name if courses else exam.name,
+            season=season_of(exam),
+            equipment=frozenset(e.name for e in getattr(exam, "requiresEquipment", []) or []),
+        ))
+
+    rooms = [
+        RoomInfo(
+            name=room.name,
+            capacity=getattr(room, "capacity", None),
+            equipment=frozenset(e.name for e in getattr(room, "hasEquipment", []) or []),
+        )
+        for room in onto.Room.instances()
+    ]
+    return exams, rooms
+
+
+def room_fits(exam: ExamInfo, room: RoomInfo) -> bool:
+    if exam.attendance is not None and room.capacity is not None and room.capacity < exam.attendance:
+        return False
+    return exam.equipment <= room.equipment
+
+
+def build_problem(exams: Iterable[ExamInfo], rooms: Iterable[RoomInfo],
+                  season_slots: Dict[str, List[str]] = DEFAULT_SEASON_SLOTS,
+                  name: str = "dei_exam_scheduling") -> Problem:
+    """
+    Builds the exam_scheduling Problem (same fluents and assign_exam action as domain.pddl)
+    directly as unified-planning objects; only true initial facts are set, everything else
+    defaults to false. cap_ok covers both capacity and required equipment.
+    """
+    exams = list(exams)
+    rooms = list(rooms)
+
+    Exam = UserType("exam")
+    Room = UserType("room")
+    Slot = UserType("slot")
+    Group = UserType("group")
+
+    unassigned = Fluent("unassigned", BoolType(), e=Exam)
+    assigned = Fluent("assigned", BoolType(), e=Exam)
+    at = Fluent("at", BoolType(), e=Exam, r=Room, s=Slot)
+    free = Fluent("free", BoolType(), r=Room, s=Slot)
+    cap_ok = Fluent("cap_ok", BoolType(), e=Exam, r=Room)
+    belongs = Fluent("belongs", BoolType(), e=Exam, g=Group)
+    group_free = Fluent("group_free", BoolType(), g=Group, s=Slot)
+    period_ok = Fluent("period_ok", BoolType(), e=Exam, s=Slot)
+
+    assign = InstantaneousAction("assign_exam", e=Exam, r=Room, s=Slot, g=Group)
+    e, r, s, g = assign.parameters
+    assign.add_precondition(unassigned(e))
+    assign.add_precondition(free(r, s))
+    assign.add_precondition(cap_ok(e, r))
+    assign.add_precondition(belongs(e, g))
+    assign.add_precondition(group_free(g, s))
+    assign.add_precondition(period_ok(e, s))
+    assign.add_effect(assigned(e), True)
+    assign.add_effect(unassigned(e), False)
+    assign.add_effect(at(e, r, s), True)
+    assign.add_effect(free(r, s), False)
+    assign.add_effect(group_free(g, s), False)
+
+    problem = Problem(name)
+    for fluent in (unassigned, assigned, at, free, cap_ok, belongs, group_free, period_ok):
+        problem.add_fluent(fluent, default_initial_value=False)
+    problem.add_action(assign)
+
+    slot_objs = {}
+    for season_list in season_slots.values():
+        for slot in season_list:
+            slot_objs.setdefault(slot, Object(pddl_name(slot), Slot))
+    room_objs = {room.name: Object(pddl_name(room.name), Room) for room in rooms}
+    group_objs = {}
+    for exam in exams:
+        group_objs.setdefault(exam.group, Object(pddl_name(exam.group), Group))
+    exam_objs = {exam.name: Object(pddl_name(exam.name), Exam) for exam in exams}
+    problem.add_objects(list(slot_objs.values()) + list(room_objs.values())
+                        + list(group_objs.values()) + list(exam_objs.values()))
+
+    for room_obj in room_objs.values():
+        for slot_obj in slot_objs.values():
+            problem.set_initial_value(free(room_obj, slot_obj), True)
+    for group_obj in group_objs.values():
+        for slot_obj in slot_objs.values():
+            problem.set_initial_value(group_free(group_obj, slot_obj), True)
+
+    for exam in exams:
+        exam_obj = exam_objs[exam.name]
+        problem.set_initial_value(unassigned(exam_obj), True)
+        problem.set_initial_value(belongs(exam_obj, group_objs[exam.group]), True)
+        for slot in season_slots.get(exam.season, []):
+            problem.set_initial_value(period_ok(exam_obj, slot_objs[slot]), True)
+        for room in rooms:
+            if room_fits(exam, room):
+                problem.set_initial_value(cap_ok(exam_obj, room_objs[room.name]), True)
+        problem.add_goal(assigned(exam_obj))
+
+    return problem
+
+
+def problem_from_ontology(onto, season_slots: Dict[str, List[str]] = DEFAULT_SEASON_SLOTS,
+                          season_of: Callable = default_season) -> Problem:
+    exams, rooms = exams_and_rooms(onto, season_of)
+    return build_problem(exams, rooms, season_slots)
+
+
+def export_pddl(problem: Problem, domain_file, problem_file):
+    """
+    Writes the problem as PDDL, for debugging or running an external planner.
+    """
+    writer = PDDLWriter(problem)
+    writer.write_domain(str(domain_file))
+    writer.write_problem(str(problem_file))
@@ -0,0 +1,159 @@
+from collections import defaultdict
+from typing import Dict, List
+
+from unified_planning.shortcuts import Problem
+
+from timetabler import exam_domains, true_facts
+
+# fluents whose true facts only enable assign_exam and can be pruned to the feasible options
+_OPTION_FLUENTS = {
+    "cap_ok": lambda e, r, s, g: (e, r),
+    "period_ok": lambda e, r, s, g: (e, s),
+    "free": lambda e, r, s, g: (r, s),
+    "group_free": lambda e, r, s, g: (g, s),
+}
+
+
+def count_ground_actions(problem) -> int:
+    """
+    Number of assign_exam(e, r, s, g) groundings whose static preconditions hold initially.
+    """
+    return sum(len(options) for options in exam_domains(problem).values())
+
+
+def _symmetry_classes(members, signature) -> List[list]:
+    classes = defaultdict(list)
+    for member in sorted(members, key=str):
+        classes[signature(member)].append(member)
+    return [members for members in classes.values() if len(members) > 1]
+
+
+def _order_identical_exams(options: Dict[object, list]):
+    """
+    Exams with the same options and a single group (e.g. the courses of one year in one season)
+    are interchangeable and need different slots. Numbering them in slot order, the i-th of n
+    exams sharing m slots can only take slots i..m-n+i, so each gets a window of m-n+1 slots.
+    """
+    for members in _symmetry_classes(options, lambda e: frozenset(options[e])):
+        if len({v[2] for v in options[members[0]]}) != 1:
+            continue
+        slots = sorted({v[1] for v in options[members[0]]}, key=str)
+        n, m = len(members), len(slots)
+        for i, e in enumerate(members):
+            window = set(slots[i:m - n + i + 1])
+            options[e] = [v for v in options[e] if v[1] in window]
+
+
+def _order_identical_rooms(options: Dict[object, list], classes: List[list]):
+    """
+    Within each class of interchangeable rooms, the k-th exam (by name) that can use the class
+    may only use its first k+1 rooms. In every slot the rooms can be renumbered in
+    order of first use to satisfy this, so no solution is lost.
+    """
+    order = sorted(options, key=str)
+    for members in classes:
+        rank = {member: i for i, member in enumerate(members)}
+        users = [e for e in order if any(v[0] in rank for v in options[e])]
+        for k, e in enumerate(users):
+            options[e] = [v for v in options[e] if rank.get(v[0], -1) <= k]
+
+
+def break_symmetries(facts: Dict[str, set], options: Dict[object, list]):
+    """
+    Prunes options (exam -> feasible (room, slot, group) values) in place.
+
+    Rooms are grouped by the capacity bands they can host (an exam's band is the set of rooms
+    cap_ok allows for it) and by the slots they are free in. The slot order of interchangeable
+    exams is fixed first; renumbering rooms afterwards doesn't move any exam to another slot.
+    """
+    _order_identical_exams(options)
+
+    band_of = defaultdict(set)
+    for e, r in facts["cap_ok"]:
+        band_of[e].add(r)
+    room_bands, room_slots = defaultdict(set), defaultdict(set)
+    for e, r in facts["cap_ok"]:
+        room_bands[r].add(frozenset(band_of[e]))
+    for r, s in facts["free"]:
+        room_slots[r].add(s)
+    rooms = {v[0] for values in options.values() for v in values}
+    _order_identical_rooms(options, _symmetry_classes(
+        rooms, lambda r: (frozenset(room_bands[r]), frozenset(room_slots[r]))))
+
+
+def reduce_problem(problem, break_symmetry: bool = True) -> Problem:
+    """
+    Returns an equivalent exam_scheduling problem with a smaller grounding:
+
+    - only objects and static facts used by some statically feasible (exam, room, slot, group)
+      option are kept, so rooms/slots/pairs ruled out by cap_ok, period_ok or belongs disappear;
+    - with break_symmetry, interchangeable exams are ordered by slot and interchangeable rooms
+      by first use, see break_symmetries. This helps the native backtracking search but can
+      mislead pyperplan's heuristic search, which then takes longer than on the full problem.
+
+    Plans for the reduced problem are valid, unchanged, for the original one.
+    """
+    options = exam_domains(problem)
+    if break_symmetry:
+        break_symmetries(true_facts(problem), options)
+    return restrict_problem(problem, options, f"{problem.name}_reduced")
+
+
+def restrict_problem(problem, options: Dict[object, list], name: str) -> Problem:
+    """
+    The problem limited to the exams in options (exam -> (room, slot, group) values) and to the
+    objects and static facts those options use; other exams and their goals are left out.
+    """
+    facts = true_facts(problem)
+    kept_facts = defaultdict(set)
+    for e, values in options.items():
+        for value in values:
+            for fluent, key in _OPTION_FLUENTS.items():
+                kept_facts[fluent].add(key(e, *value))
+
+    kept_objects = set(options)
+    for values in options.values():
+        kept_objects.update(x for value in values for x in value)
+    for fluent in ("assigned", "at", "belongs"):
+        for args in facts[fluent]:
+            if args[0] in options:
+                kept_objects.update(args)
+
+    reduced = Problem(name, environment=problem.environment)
+    for fluent in problem.fluents:
+        reduced.add_fluent(fluent, default_initial_value=False)
+    for action in problem.actions:
+        reduced.add_action(action)
+    reduced.add_objects([obj for obj in problem.all_objects if obj in kept_objects])
+
+    for fluent_exp, value in problem.explicit_initial_values.items():
+        if not value.is_true():
+            continue
+        fluent_name = fluent_exp.fluent().name
+        args = tuple(arg.object() for arg in fluent_exp.args)
+        if fluent_name in _OPTION_FLUENTS and args not in kept_facts[fluent_name]:
+            continue
+        if all(arg in kept_objects for arg in args):
+            reduced.set_initial_value(fluent_exp, True)
+    for goal in problem.goals:
+        for conjunct in _conjuncts(goal):
+            if _objects(conjunct) <= kept_objects:
+                reduced.add_goal(conjunct)
+    return reduced
+
+
+def _conjuncts(expr):
+    """
+    Splits (and ...) goals, as PDDLReader builds them, into their parts.
+    """
+    if expr.is_and():
+        for arg in expr.args:
+            yield from _conjuncts(arg)
+    else:
+        yield expr
+
+
+def _objects(expr) -> set:
+    if expr.is_object_exp():
+        return {expr.object()}
+    return set().union(*(_objects(arg) for arg in expr.args))
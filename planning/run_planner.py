@@ -1,20 +1,91 @@
+import argparse
 import pathlib
 from unified_planning.shortcuts import OneshotPlanner, get_environment
 from unified_planning.engines.results import POSITIVE_OUTCOMES
 from unified_planning.io import PDDLReader
 
+import timetabler
+from decomposition import solve_decomposed
+from portfolio import DEFAULT_ENGINES, run_portfolio
+from problem_builder import export_pddl, problem_from_ontology
+from reduction import count_ground_actions, reduce_problem
+
+def load_problem(base_path, owl_file=None, reduce=False, break_symmetry=False):
+    """
+    Builds the problem straight from an ontology file if one is given, otherwise parses the
+    hand-written domain.pddl + problem.pddl. reduce prunes the grounding (see reduction.py).
+    """
+    if owl_file is not None:
+        from owlready2 import get_ontology
+        onto = get_ontology(str(pathlib.Path(owl_file).resolve())).load()
+        problem = problem_from_ontology(onto)
+    else:
+        reader = PDDLReader()
+        domain_file = base_path / "domain.pddl"
+        problem_file = base_path / "problem.pddl"
+        problem = reader.parse_problem(domain_file, problem_file)
+    return reduce_problem(problem, break_symmetry) if reduce else problem
+
 def main():
     base_path = pathlib.Path(__file__).parent.resolve()
     get_environment().credits_stream = None
 
-    reader = PDDLReader()
-    domain_file = base_path / "domain.pddl"
-    problem_file = base_path / "problem.pddl"
+    parser = argparse.ArgumentParser(description="Exam scheduling planner")
+    parser.add_argument("--owl", metavar="FILE", help="build the problem from this ontology instead of problem.pddl")
+    parser.add_argument("--export-pddl", metavar="DIR", help="also write the problem as domain/problem PDDL to DIR")
+    parser.add_argument("--engine", choices=["pyperplan", "native", "portfolio"], default="pyperplan",
+                        help="native = built-in DSatur/backtracking timetabler, much faster on large instances; "
+                             "portfolio = run several engines in parallel and keep the first valid plan")
+    parser.add_argument("--portfolio-engines", default=",".join(DEFAULT_ENGINES), metavar="NAMES",
+                        help="comma-separated engines for --engine portfolio (default: %(default)s)")
+    parser.add_argument("--reduce", action="store_true",
+                        help="prune the grounding to feasible options first; with --engine native, also break "
+                             "room/slot symmetries (this slows pyperplan down, so it is not done for it)")
+    parser.add_argument("--decompose", action="store_true",
+                        help="solve independent seasons/room groups separately in a process pool (not with portfolio)")
+    parser.add_argument("--time-limit", type=float, metavar="SECONDS",
+                        help="time limit for the native engine, per engine in the portfolio, or per decomposed part")
+    args = parser.parse_args()
+    if args.decompose and args.engine == "portfolio":
+        parser.error("--decompose can't be combined with --engine portfolio")
 
-    problem = reader.parse_problem(domain_file, problem_file)
+    # portfolio runs pyperplan too, so only the native engine alone gets the symmetry breaking
+    break_symmetry = args.engine == "native"
+    problem = load_problem(base_path, args.owl)
+    if args.reduce:
+        before = count_ground_actions(problem)
+        problem = reduce_problem(problem, break_symmetry)
+        print(f"Grounding reduced from {before} to {count_ground_actions(problem)} assign_exam actions")
 
-    with OneshotPlanner(problem_kind=problem.kind, name="pyperplan") as planner:
-        result = planner.solve(problem)
+    if args.export_pddl:
+        out = pathlib.Path(args.export_pddl)
+        out.mkdir(parents=True, exist_ok=True)
+        export_pddl(problem, out / "domain.pddl", out / "problem.pddl")
+        print(f"PDDL written to {out}")
+
+    if args.decompose:
+        loader_args = (base_path, args.owl, args.reduce, break_symmetry)
+        result, parts = solve_decomposed(problem, load_problem, loader_args, args.engine, timeout=args.time_limit)
+        print(f"{'Exams':<8}{'Slots':<28}{'Status':<26}Wall time")
+        for part in parts:
+            wall = f"{part.wall_time:.2f}s" if part.wall_time is not None else "-"
+            print(f"{part.exams:<8}{','.join(part.slots):<28}{part.status:<26}{wall}"
+                  + (f"  ({part.error})" if part.error else ""))
+    elif args.engine == "native":
+        result = timetabler.solve(problem, args.time_limit)
+    elif args.engine == "portfolio":
+        engines = [name.strip() for name in args.portfolio_engines.split(",") if name.strip()]
+        loader_args = (base_path, args.owl, args.reduce, break_symmetry)
+        result, runs = run_portfolio(problem, load_problem, loader_args, engines, default_timeout=args.time_limit)
+        print(f"{'Engine':<16}{'Status':<26}Wall time")
+        for run in runs:
+            print(f"{run.engine:<16}{run.status:<26}{run.wall_time:.2f}s" + (f"  ({run.error})" if run.error else ""))
+        if result is None:
+            print("No engine found a valid plan.")
+            return
+    else:
+        with OneshotPlanner(problem_kind=problem.kind, name="pyperplan") as planner:
+            result = planner.solve(problem)
 
     print("Status:", result.status)
     if result.status in POSITIVE_OUTCOMES and result.plan is not None:
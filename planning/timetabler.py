@@ -0,0 +1,203 @@
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from unified_planning.engines.results import PlanGenerationResult, PlanGenerationResultStatus
+from unified_planning.plans import ActionInstance, SequentialPlan
+
+ENGINE_NAME = "native-dsatur"
+
+# (room, slot, group) an exam can be given
+Value = Tuple[object, object, object]
+
+
+def true_facts(problem) -> Dict[str, set]:
+    """
+    Fluent name -> set of argument tuples (unified-planning Objects) that are initially true.
+    """
+    facts = defaultdict(set)
+    for fluent_exp, value in problem.explicit_initial_values.items():
+        if value.is_true():
+            facts[fluent_exp.fluent().name].add(tuple(arg.object() for arg in fluent_exp.args))
+    return facts
+
+
+def exam_domains(problem) -> Dict[object, List[Value]]:
+    """
+    For every unassigned exam, the (room, slot, group) values for which assign_exam is applicable
+    in the initial state: cap_ok(e, r), period_ok(e, s), free(r, s), belongs(e, g), group_free(g, s).
+    """
+    facts = true_facts(problem)
+    free = facts["free"]
+    group_free = facts["group_free"]
+
+    rooms_of = defaultdict(list)
+    for e, r in facts["cap_ok"]:
+        rooms_of[e].append(r)
+    slots_of = defaultdict(list)
+    for e, s in facts["period_ok"]:
+        slots_of[e].append(s)
+    groups_of = defaultdict(list)
+    for e, g in facts["belongs"]:
+        groups_of[e].append(g)
+
+    domains = {}
+    for (e,) in facts["unassigned"]:
+        domains[e] = [
+            (r, s, g)
+            for s in slots_of[e]
+            for r in rooms_of[e] if (r, s) in free
+            for g in groups_of[e] if (g, s) in group_free
+        ]
+    return domains
+
+
+def _covers_all(options: Dict[object, set]) -> bool:
+    """
+    True if every exam can get a distinct option (bipartite matching, augmenting paths by BFS).
+    """
+    owner = {}
+    for e, keys in options.items():
+        free_key = next((k for k in keys if k not in owner), None)
+        if free_key is not None:
+            owner[free_key] = e
+            continue
+        # BFS over exams; parent[key] = (previous key, exam that would take key)
+        parent = {k: (None, e) for k in keys}
+        queue = list(keys)
+        end = None
+        while queue and end is None:
+            next_queue = []
+            for key in queue:
+                for k in options[owner[key]]:
+                    if k in parent:
+                        continue
+                    parent[k] = (key, owner[key])
+                    if k not in owner:
+                        end = k
+                        break
+                    next_queue.append(k)
+                if end is not None:
+                    break
+            queue = next_queue
+        if end is None:
+            return False
+        while end is not None:
+            previous, taker = parent[end]
+            owner[end] = taker
+            end = previous
+    return True
+
+
+def timetable(domains: Dict[object, List[Value]], time_limit: Optional[float] = None):
+    """
+    Assigns every exam one value so that no (room, slot) and no (group, slot) is used twice.
+
+    Exams are picked DSatur-style (fewest remaining values first, then most group clashes) and
+    values least-constraining first; each assignment forward-checks the other exams' domains
+    and the search backtracks on a wipe-out. Returns {exam: value}, None if no timetable exists,
+    or raises TimeoutError when time_limit (seconds) runs out.
+    """
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    live = {e: set(values) for e, values in domains.items()}
+    if any(not values for values in live.values()):
+        return None
+    # cheap necessary conditions, so over-full seasons are rejected without a search
+    if not _covers_all({e: {(r, s) for r, s, _ in values} for e, values in live.items()}):
+        return None
+    if not _covers_all({e: {(g, s) for _, s, g in values} for e, values in live.items()}):
+        return None
+
+    # values that use a given (room, slot) or (group, slot), for forward checking
+    holders = defaultdict(list)
+    for e, values in live.items():
+        for value in values:
+            r, s, g = value
+            holders[("room", r, s)].append((e, value))
+            holders[("group", g, s)].append((e, value))
+
+    group_degree = {
+        e: len({other for r, s, g in values for other, _ in holders[("group", g, s)]}) - 1
+        for e, values in live.items()
+    }
+
+    def impact(value):
+        r, s, g = value
+        return len(holders[("room", r, s)]) + len(holders[("group", g, s)])
+
+    unassigned = set(live)
+    assignment = {}
+
+    def assign(e, value):
+        """Commits e=value and prunes the others; returns the pruned (exam, value) list or None on a wipe-out."""
+        r, s, g = value
+        removed = []
+        for key in (("room", r, s), ("group", g, s)):
+            for other, w in holders[key]:
+                if other != e and other in unassigned and w in live[other]:
+                    live[other].discard(w)
+                    removed.append((other, w))
+                    if not live[other]:
+                        undo(removed)
+                        return None
+        unassigned.discard(e)
+        assignment[e] = value
+        return removed
+
+    def undo(removed):
+        for other, w in removed:
+            live[other].add(w)
+
+    def choose():
+        return min(unassigned, key=lambda e: (len(live[e]), -group_degree[e], str(e)))
+
+    stack = []  # [exam, remaining values, pruned by the current value]
+    while True:
+        if not unassigned:
+            return assignment
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError("exam timetabling time limit reached")
+
+        e = choose()
+        stack.append([e, iter(sorted(live[e], key=lambda v: (impact(v), str(v)))), None])
+
+        # advance the top frame to its next consistent value, backtracking as needed
+        while stack:
+            frame = stack[-1]
+            exam, values, removed = frame
+            if removed is not None:
+                undo(removed)
+                del assignment[exam]
+                unassigned.add(exam)
+                frame[2] = None
+            for value in values:
+                removed = assign(exam, value)
+                if removed is not None:
+                    frame[2] = removed
+                    break
+            else:
+                stack.pop()
+                continue
+            break
+        else:
+            return None
+
+
+def solve(problem, time_limit: Optional[float] = None) -> PlanGenerationResult:
+    """
+    Solves an exam_scheduling problem (parsed PDDL or built by problem_builder) and returns a
+    PlanGenerationResult whose plan is a sequence of assign_exam(e, r, s, g) actions, like the
+    plans produced by the unified-planning engines.
+    """
+    try:
+        assignment = timetable(exam_domains(problem), time_limit)
+    except TimeoutError:
+        return PlanGenerationResult(PlanGenerationResultStatus.TIMEOUT, None, ENGINE_NAME)
+
+    if assignment is None:
+        return PlanGenerationResult(PlanGenerationResultStatus.UNSOLVABLE_PROVEN, None, ENGINE_NAME)
+
+    action = problem.action("assign_exam")
+    ordered = sorted(assignment.items(), key=lambda item: (str(item[1][1]), str(item[1][0])))
+    plan = SequentialPlan([ActionInstance(action, (e, r, s, g)) for e, (r, s, g) in ordered])
+    return PlanGenerationResult(PlanGenerationResultStatus.SOLVED_SATISFICING, plan, ENGINE_NAME)
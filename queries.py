@@ -12,6 +12,7 @@ if __name__ == "__main__":
 
     # Load existing ontology from file
     onto = get_ontology("university.owl").load()
+    mark_clean("university.owl")  # the saved file is already classified
 
     # Query: Find all honors students (grade >= 18.0)
     print("\n=== Students ===")
@@ -69,8 +70,9 @@ bookings: {room.get_booking_count()}""")
         print("\n=== Room Booking Conflict Management ===")
         
         # Create agent instance
-        conflict_agent = OverBookedRoomAgent("ConflictManager")
-        conflict_agent.has_name = "Booking Conflict Manager"
+        with untracked_writes():
+            conflict_agent = OverBookedRoomAgent("ConflictManager")
+            conflict_agent.has_name = "Booking Conflict Manager"
         
         # Generate conflict report
         report = conflict_agent.generate_conflict_report()
@@ -114,19 +116,18 @@ bookings: {room.get_booking_count()}""")
                     for fail in results['failed']:
                         print(f"  - Room {fail['room']}: {fail['reason']}")
             
-            # Run reasoner again to update inferred classes
-            sync_reasoner(infer_property_values=True)
-            
-            # Save the updated ontology
-            onto.save(file="university.owl", format="rdfxml")
-            print("\nOntology updated and saved.")
+            # Update inferred classes and save, unless nothing changed
+            classify_rooms()
+            if save_ontology(onto, "university.owl"):
+                print("\nOntology updated and saved.")
 
     def optimization():
         print("\n=== Capacity Optimization Analysis ===")
         
         # Create agent instance
-        optimization_agent = CapacityOptimizationAgent("CapacityOptimizer")
-        optimization_agent.has_name = "Room Capacity Optimizer"
+        with untracked_writes():
+            optimization_agent = CapacityOptimizationAgent("CapacityOptimizer")
+            optimization_agent.has_name = "Room Capacity Optimizer"
         
         # Generate optimization report
         report = optimization_agent.generate_optimization_report()
@@ -170,11 +171,9 @@ bookings: {room.get_booking_count()}""")
             else:
                 print("No optimizations were applied.")
         
-        # Run reasoner again to update inferred classes
-        sync_reasoner(infer_property_values=True)
-        
-        # Save the updated ontology
-        onto.save(file="university.owl", format="rdfxml")
+        # Update inferred classes and save, unless nothing changed
+        classify_rooms()
+        save_ontology(onto, "university.owl")
 
 
     def print_all_bookings():
@@ -187,10 +186,7 @@ bookings: {room.get_booking_count()}""")
             
             for room in onto.search(type=Classroom):
                 if hasattr(room, 'has_booking') and room.has_booking:
-                    room_bookings[room] = sorted(
-                        room.has_booking, 
-                        key=lambda b: (b.has_start_time if hasattr(b, 'has_start_time') else "00:00")
-                    )
+                    room_bookings[room] = sorted(room.has_booking, key=booking_span)
             
             # Sort rooms by name
             sorted_rooms = sorted(room_bookings.items(), key=lambda x: x[0].has_name)
@@ -213,11 +209,7 @@ bookings: {room.get_booking_count()}""")
                     priority = booking.has_priority if hasattr(booking, 'has_priority') else 0
                     
                     # Find associated activity
-                    activity = None
-                    for act in list(onto.search(type=Lecture)) + list(onto.search(type=Exam)):
-                        if hasattr(act, 'booking_of') and booking in act.booking_of:
-                            activity = act
-                            break
+                    activity = activity_for_booking(booking)
                     
                     activity_name = "No Activity"
                     activity_type = ""
@@ -235,7 +227,8 @@ bookings: {room.get_booking_count()}""")
                     
                     # Print booking info
                     print(f"│ #{i} ".ljust(79) + "│")
-                    print(f"│    Time: {start_time} - {end_time}".ljust(79) + "│")
+                    day = f"{booking.has_date} " if booking.has_date else ""
+                    print(f"│    Time: {day}{start_time} - {end_time}".ljust(79) + "│")
                     print(f"│   {activity_type} {activity_name}".ljust(79) + "│")
                     print(f"│    Course: {course_name}".ljust(79) + "│")
                     print(f"│    Expected Attendance: {attendance}".ljust(79) + "│")
@@ -8,8 +8,8 @@ from ontology.queries import (
 )
 
 
-def run_cli(onto):
-    agent = BookingAgent(onto, verbose=True)
+def run_cli(onto, journal=None, calendar=None):
+    agent = BookingAgent(onto, verbose=True, journal=journal, calendar=calendar)
 
     help_text = """
 Commands:
@@ -28,6 +28,14 @@ Commands:
     available_between 2026-01-05T09:00 2026-01-05T11:00 40 Projector
     available_between 2026-01-05T09:00 2026-01-05T11:00 20 Projector,Computers
 
+  import <kind> <file>
+    kind: equipment | rooms | courses | activities | bookings
+    file: .csv (with header) or .jsonl
+    example:
+    import rooms data/rooms.csv
+
+  export [file]              - write the ontology as RDF/XML (default: room_mgmt_export.owl)
+
   suggest
   help
   exit
@@ -99,7 +107,10 @@ Commands:
             if equipment:
                 req_eq = [x.strip() for x in equipment.split(",") if x.strip()]
 
-            print_available_between(onto, start, end, min_capacity=min_capacity, required_equipment=req_eq)
+            print_available_between(
+                onto, start, end, min_capacity=min_capacity, required_equipment=req_eq,
+                index=agent.availability, equipment=agent.equipment,
+            )
             continue
 
         if cmd_lower.startswith("book "):
@@ -125,10 +136,47 @@ Commands:
                         print("  " + line)
             continue
 
+        if cmd_lower.startswith("import "):
+            parts = cmd.split(maxsplit=2)
+            if len(parts) != 3:
+                print("Usage: import <kind> <file>")
+                continue
+
+            _, kind, path = parts
+            from ontology.importer import Importer
+            try:
+                report = Importer(onto, agent).import_file(kind.lower(), path)
+            except (OSError, ValueError) as e:
+                print(f"Import failed: {e}")
+                continue
+
+            # the journal only records bookings, so snapshot the imported rooms/activities/courses
+            # right away; otherwise replaying later bookings would not find them after a crash
+            if journal is not None and report.imported:
+                journal.compact()
+
+            print(report.summary())
+            for line in report.errors[:20]:
+                print("  " + line)
+            if len(report.errors) > 20:
+                print(f"  ... {len(report.errors) - 20} more errors")
+            continue
+
+        if cmd_lower == "export" or cmd_lower.startswith("export "):
+            parts = cmd.split(maxsplit=1)
+            path = parts[1] if len(parts) == 2 else "room_mgmt_export.owl"
+            try:
+                onto.save(file=path, format="rdfxml")
+            except OSError as e:
+                print(f"Export failed: {e}")
+                continue
+            print(f"Exported ontology to {path}")
+            continue
+
         if cmd_lower == "suggest":
             # keep your existing suggest handler; leaving it as-is
             from agents.second_agent import AuditAgent
-            a2 = AuditAgent(onto)
+            a2 = AuditAgent(onto, calendar=agent.calendar, availability=agent.availability)
             sugg = a2.generate_suggestions()
             if not sugg:
                 print("No suggestions (no detected problems).")
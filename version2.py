@@ -1,5 +1,15 @@
+import argparse
+from contextlib import contextmanager
+from datetime import date
+
 from owlready2 import *
 
+from ontology.assignment import min_cost_assignment
+from ontology.availability import RoomSchedule
+from ontology.equipment import EquipmentCatalog
+from ontology.intervals import overlap_clusters, overlapping_pairs
+from ontology.transaction import Transaction
+
 # TODO: If needed, update with the path to the Java interpreter
 owlready2.JAVA_EXE = "java"
 
@@ -13,10 +23,9 @@ with onto:
         """Classroom for courses"""
         def update_status_based_on_bookings(self):
             """Update room status based on whether it has bookings."""
-            if hasattr(self, 'has_booking') and self.has_booking:
-                self.has_status = True  # Busy
-            else:
-                self.has_status = False  # Available
+            busy = bool(getattr(self, 'has_booking', None))  # True = Busy, False = Available
+            if self.has_status != busy:
+                self.has_status = busy
         
         def is_available(self) -> bool:
             """Check if room is available (no bookings)."""
@@ -38,6 +47,7 @@ with onto:
                 else:
                     self.has_booking.append(booking)
             self.update_status_based_on_bookings()
+            _note_booking(booking)
             if hasattr(booking, 'is_booking_for'):
                 booking.is_booking_for.append(self)
             else:
@@ -50,6 +60,7 @@ with onto:
                 if hasattr(booking, 'is_booking_for') and self in booking.is_booking_for:
                     booking.is_booking_for.remove(self)
                 self.update_status_based_on_bookings()
+                _forget_booking(booking)
         
     
     class RoomBooking(Thing): 
@@ -160,6 +171,12 @@ with onto:
         range = [str]
         python_name = "has_end_time"
 
+    class HasDate(DataProperty, FunctionalProperty):
+        """Booking date (YYYY-MM-DD); bookings without a date are all on the same day"""
+        domain = [RoomBooking]
+        range = [str]
+        python_name = "has_date"
+
     class HasPriority(DataProperty, FunctionalProperty):
         """Booking priority (higher number = higher priority)"""
         domain = [RoomBooking]
@@ -190,6 +207,35 @@ with onto:
         range = [bool]
         python_name = "has_status"
 
+    # ========================================
+    # NUMERIC BOOKING TIMES
+    # ========================================
+
+    # (start, end) minutes per booking, with the (date, start, end) strings they were computed
+    # from; kept on the Python side only and recomputed whenever those strings change
+    _booking_spans = {}
+
+    def clock_minutes(time_str: str, default: int = 0) -> int:
+        """Convert "HH:MM" to minutes since midnight."""
+        if not time_str:
+            return default
+        parts = time_str.split(':')
+        return int(parts[0]) * 60 + int(parts[1])
+
+    def booking_span(booking):
+        """(start, end) of a booking in minutes (day ordinal * 1440 + time of day), comparable across days."""
+        raw = (booking.has_date, booking.has_start_time, booking.has_end_time)
+        cached = _booking_spans.get(booking)
+        if cached is None or cached[0] != raw:
+            day = date.fromisoformat(raw[0]).toordinal() * 1440 if raw[0] else 0
+            # a missing start/end means the start/end of the day (00:00 / 23:59)
+            cached = (raw, (day + clock_minutes(raw[1]), day + clock_minutes(raw[2], 23 * 60 + 59)))
+            _booking_spans[booking] = cached
+        return cached[1]
+
+    def spans_overlap(span1, span2) -> bool:
+        return span1[0] < span2[1] and span2[0] < span1[1]
+
     # ========================================
     # INFERRED CLASSES (First-Order Logic)
     # ========================================
@@ -202,6 +248,146 @@ with onto:
         """Room with more than one booking """
         equivalent_to = [Classroom & HasBooking.min(2, RoomBooking)]
 
+    # ========================================
+    # CHANGE GENERATION
+    # ========================================
+
+    # Every triple written to the quadstore counts: property assignments, list edits, new or
+    # destroyed entities. Classification and saving are skipped when nothing was written since.
+    # Bookkeeping writes (agent individuals, their names) are made inside untracked_writes()
+    _classified_generation = None
+    _saved_generation = {}
+    _untracked_changes = 0
+
+    def _generation() -> int:
+        """Quadstore writes so far (SQLite total_changes of the world's connection), minus untracked ones."""
+        return onto.world.graph.db.total_changes - _untracked_changes
+
+    @contextmanager
+    def untracked_writes():
+        """Writes made inside the block don't make the ontology look changed."""
+        global _untracked_changes
+        before = onto.world.graph.db.total_changes
+        try:
+            yield
+        finally:
+            _untracked_changes += onto.world.graph.db.total_changes - before
+
+    def mark_clean(file: str = None):
+        """Record the current state as classified (and saved to file), e.g. right after loading it."""
+        global _classified_generation
+        _classified_generation = _generation()
+        if file is not None:
+            _saved_generation[file] = _generation()
+
+    def save_ontology(ontology, file: str = "university.owl", format: str = "rdfxml") -> bool:
+        """Save ontology to file unless nothing has changed since it was last saved there."""
+        if _saved_generation.get(file) == _generation():
+            return False
+        ontology.save(file=file, format=format)
+        _saved_generation[file] = _generation()
+        return True
+
+    # ========================================
+    # CLOSED-WORLD CLASSIFICATION
+    # ========================================
+
+    def _set_membership(room, cls, member: bool):
+        if member and cls not in room.is_a:
+            room.is_a.append(cls)
+        elif not member and cls in room.is_a:
+            room.is_a.remove(cls)
+            if not any(issubclass(c, Classroom) for c in room.is_a if isinstance(c, ThingClass)):
+                room.is_a.append(Classroom)
+
+    def classify_rooms(use_hermit: bool = False):
+        """
+        Evaluate AvailableRoom and OverBookedRoom directly from has_booking.
+        The bookings asserted in the ontology are taken as complete (closed world), so no JVM
+        is needed. The only property values HermiT would infer are the has_booking/is_booking_for
+        inverses, which owlready2 already keeps in sync. use_hermit=True (--hermit on the command
+        line) runs the full HermiT reasoner instead.
+        Returns False without doing anything if the ontology is unchanged since the last classification.
+        """
+        global _classified_generation
+        if _classified_generation == _generation():
+            return False
+        if use_hermit:
+            sync_reasoner(infer_property_values=True)
+            _classified_generation = _generation()
+            return True
+        for room in Classroom.instances():
+            count = sum(1 for b in (room.has_booking or []) if isinstance(b, RoomBooking))
+            _set_membership(room, AvailableRoom, count == 0)
+            _set_membership(room, OverBookedRoom, count >= 2)
+        _classified_generation = _generation()
+        return True
+
+    # ========================================
+    # REVERSE INDEX: RoomBooking -> Activity
+    # ========================================
+
+    # Built from Lecture/Exam booking_of. add_booking and remove_booking keep it current; a miss
+    # (e.g. booking_of was set after the index was built) rebuilds it, at most once per
+    # generation, so bookings without an activity don't rescan every activity on each lookup
+    _booking_activity = {}
+    _booking_index_generation = None
+
+    def _rebuild_booking_index():
+        global _booking_index_generation
+        _booking_activity.clear()
+        for cls in (Lecture, Exam):
+            for activity in cls.instances():
+                for b in (activity.booking_of or []):
+                    _booking_activity.setdefault(b, activity)
+        _booking_index_generation = _generation()
+
+    def _indexed_activity(booking):
+        activity = _booking_activity.get(booking)
+        if activity is not None and booking in (activity.booking_of or []):
+            return activity
+        return None
+
+    def _note_booking(booking):
+        """Drop an out-of-date entry for a booking being added to a room."""
+        if _indexed_activity(booking) is None:
+            _booking_activity.pop(booking, None)
+
+    def _forget_booking(booking):
+        """Drop a booking that no longer belongs to any room."""
+        if not booking.is_booking_for:
+            _booking_activity.pop(booking, None)
+
+    def activity_for_booking(booking):
+        """Find the activity associated with a booking."""
+        activity = _indexed_activity(booking)
+        if activity is None and _booking_index_generation != _generation():
+            _rebuild_booking_index()
+            activity = _indexed_activity(booking)
+        return activity
+
+    def _move_room_booking(tx, booking, activity, from_room, to_room):
+        """Move a booking between rooms inside a Transaction, logging how to undo it."""
+        tx.record(activity, 'takes_place_in')
+        from_room.remove_booking(booking)
+        tx.add_undo(lambda: from_room.add_booking(booking))
+        to_room.add_booking(booking)
+        tx.add_undo(lambda: to_room.remove_booking(booking))
+        activity.takes_place_in = [to_room]
+
+    # Equipment bitmasks shared by the agents (masks are computed on first use). The catalogue is
+    # thrown away after any quadstore write (see _generation), so edited equipment is never
+    # matched against stale masks; a batch of queries without writes reuses it
+    _equipment = None
+    _equipment_generation = None
+
+    def _equipment_catalog() -> EquipmentCatalog:
+        global _equipment, _equipment_generation
+        if _equipment is None or _equipment_generation != _generation():
+            _equipment = EquipmentCatalog(room_prop="has_prerequisite_equipment", activity_prop="has_prerequisite")
+            _equipment_generation = _generation()
+        return _equipment
+
     #=======================================
     # AGENTS
     #=======================================
@@ -234,10 +420,7 @@ with onto:
                 return sorted(efficiencies, key=lambda x: x['efficiency'])
                    
         def _find_activity_for_booking(self, booking):
-                for activity in list(Lecture.instances()) + list(Exam.instances()):
-                    if hasattr(activity, 'booking_of') and booking in activity.booking_of:
-                        return activity
-                return None
+                return activity_for_booking(booking)
 
         def _calculate_efficiency(self, activity, room):
             """Calculate room utilization efficiency (0-1 scale)."""
@@ -324,8 +507,7 @@ with onto:
                 return True
             
             activity_booking = activity.booking_of[0]
-            activity_start = activity_booking.has_start_time if hasattr(activity_booking, 'has_start_time') else "00:00"
-            activity_end = activity_booking.has_end_time if hasattr(activity_booking, 'has_end_time') else "23:59"
+            activity_span = booking_span(activity_booking)
             
             if not hasattr(room, 'has_booking') or not room.has_booking:
                 return True
@@ -334,40 +516,15 @@ with onto:
                 if booking == activity_booking:
                     continue
                 
-                booking_start = booking.has_start_time if hasattr(booking, 'has_start_time') else "00:00"
-                booking_end = booking.has_end_time if hasattr(booking, 'has_end_time') else "23:59"
-                
                 # Check for time overlap
-                if self._times_overlap(activity_start, activity_end, booking_start, booking_end):
+                if spans_overlap(activity_span, booking_span(booking)):
                     return False
             
             return True
         
-        def _times_overlap(self, start1: str, end1: str, start2: str, end2: str) -> bool:
-            """Check if two time intervals overlap."""
-            def to_minutes(time_str):
-                if not time_str:
-                    return 0
-                parts = time_str.split(':')
-                return int(parts[0]) * 60 + int(parts[1])
-            
-            s1, e1 = to_minutes(start1), to_minutes(end1)
-            s2, e2 = to_minutes(start2), to_minutes(end2)
-            
-            return not (e1 <= s2 or e2 <= s1)
-        
         def _room_has_required_equipment(self, room: Classroom, activity: Activity):
             """Check if room has all equipment required by the activity."""
-            if not hasattr(activity, 'has_prerequisite') or not activity.has_prerequisite:
-                return True
-            
-            if not hasattr(room, 'has_prerequisite_equipment') or not room.has_prerequisite_equipment:
-                return False
-            
-            required_equipment = set(activity.has_prerequisite)
-            room_equipment = set(room.has_prerequisite_equipment)
-            
-            return required_equipment.issubset(room_equipment)
+            return _equipment_catalog().has_all(room, activity)
 
         
         def generate_optimization_report(self):
@@ -421,54 +578,96 @@ with onto:
             return report
         
         def apply_optimizations(self, min_efficiency_gain: float = 0.2):
-            """Apply the best optimization suggestions automatically."""
-            report = self.generate_optimization_report()
-            applied_changes = []
+            """
+            Reassign rooms to maximise total efficiency, one time-overlap cluster at a time.
+            Bookings in a cluster get distinct rooms through a min-cost assignment over
+            _calculate_efficiency; moving a booking costs min_efficiency_gain, so a move is only
+            made when it pays for itself.
+            """
+            rooms = list(Classroom.instances())
+            movable = []
+            fixed = []
+            for room in rooms:
+                for booking in (room.has_booking or []):
+                    activity = self._find_activity_for_booking(booking)
+                    if activity and activity.has_expected_attendance is not None:
+                        movable.append((*booking_span(booking), (booking, activity, room)))
+                    else:
+                        fixed.append((*booking_span(booking), (booking, None, room)))
             
-            for suggestion in report['optimization_suggestions']:
-                if suggestion['efficiency_gain'] >= min_efficiency_gain:
-                    # Find the activity and rooms
-                    activity_name = suggestion['activity']
-                    old_room_name = suggestion['move_from']
-                    new_room_name = suggestion['move_to']
-                    
-                    # Find the actual instances
-                    activity = None
-                    for act in list(Lecture.instances()) + list(Exam.instances()):
-                        if hasattr(act, 'has_name') and act.has_name == activity_name:
-                            activity = act
-                            break
-                    
-                    old_room = None
-                    new_room = None
-                    for room in Classroom.instances():
-                        if room.has_name == old_room_name:
-                            old_room = room
-                        elif room.has_name == new_room_name:
-                            new_room = room
-                    
-                    if activity and old_room and new_room:
-                        # Move the booking
-                        if hasattr(activity, 'booking_of') and activity.booking_of:
-                            booking = activity.booking_of[0]
-                            
-                            # Remove from old room
-                            old_room.remove_booking(booking)
-                            
-                            # Add to new room
-                            new_room.add_booking(booking)
-                            
-                            # Update activity location
-                            activity.takes_place_in = [new_room]
-                            
-                            applied_changes.append({
-                                'activity': activity_name,
-                                'from_room': old_room_name,
-                                'to_room': new_room_name,
-                                'efficiency_gain': suggestion['efficiency_gain']
-                            })
+            applied_changes = []
+            for cluster in overlap_clusters(movable + fixed):
+                applied_changes.extend(self._optimize_cluster(cluster, rooms, min_efficiency_gain))
             
             return applied_changes
+        
+        def _optimize_cluster(self, cluster, rooms, min_efficiency_gain: float):
+            """
+            Solve one cluster of overlapping bookings; returns the moves made.
+            Bookings are placed in start order, one clique of mutually overlapping bookings at a
+            time, each clique as its own min-cost assignment (so the result is optimal per clique,
+            not for the whole cluster). A room is ruled out for a booking if a fixed or an already
+            placed booking overlaps it there, or if a later overlapping booking still holds it, so
+            bookings that are merely chained together through others may still share a room.
+            A clique with no feasible assignment keeps its rooms and the next clique carries on;
+            the rules above guarantee staying put never collides with a move made earlier.
+            """
+            movable = sorted((entry for entry in cluster if entry[1] is not None),
+                             key=lambda entry: booking_span(entry[0]))
+            blocked = [(booking_span(booking), room) for booking, activity, room in cluster if activity is None]
+            column = {room: col for col, room in enumerate(rooms)}
+            placed = []  # (span, room) of the movable bookings assigned so far
+            assignment = []
+            
+            i = 0
+            while i < len(movable):
+                # sorted by start, so the next bookings all overlap while they start before the earliest end
+                clique_end = booking_span(movable[i][0])[1]
+                j = i + 1
+                while j < len(movable) and booking_span(movable[j][0])[0] < clique_end:
+                    clique_end = min(clique_end, booking_span(movable[j][0])[1])
+                    j += 1
+                later = [(booking_span(booking), room) for booking, activity, room in movable[j:]]
+                
+                cost = []
+                for booking, activity, current_room in movable[i:j]:
+                    span = booking_span(booking)
+                    row = []
+                    for room in rooms:
+                        if any(r == room and spans_overlap(span, s) for s, r in placed) or (
+                                room != current_room and (
+                                    not self._room_has_required_equipment(room, activity)
+                                    or any(r == room and spans_overlap(span, s) for s, r in blocked + later))):
+                            row.append(None)
+                            continue
+                        efficiency = self._calculate_efficiency(activity, room)
+                        row.append(-efficiency if room == current_room else min_efficiency_gain - efficiency)
+                    cost.append(row)
+                
+                columns = min_cost_assignment(cost)
+                if columns is None:
+                    # e.g. an existing double booking with no free room to resolve it: leave it be
+                    columns = [column[current_room] for booking, activity, current_room in movable[i:j]]
+                for (booking, activity, current_room), col in zip(movable[i:j], columns):
+                    placed.append((booking_span(booking), rooms[col]))
+                    assignment.append(col)
+                i = j
+            
+            changes = []
+            with Transaction() as tx:
+                for (booking, activity, old_room), col in zip(movable, assignment):
+                    new_room = rooms[col]
+                    if new_room == old_room:
+                        continue
+                    _move_room_booking(tx, booking, activity, old_room, new_room)
+                    changes.append({
+                        'activity': activity.has_name if hasattr(activity, 'has_name') else activity.name,
+                        'from_room': old_room.has_name,
+                        'to_room': new_room.has_name,
+                        'efficiency_gain': (self._calculate_efficiency(activity, new_room)
+                                            - self._calculate_efficiency(activity, old_room))
+                    })
+            return changes
 
     class OverBookedRoomAgent(RoomBooking):
             """
@@ -484,54 +683,30 @@ with onto:
                     if not hasattr(room, 'has_booking') or not room.has_booking:
                         continue
                     
-                    bookings = list(room.has_booking)
+                    # Sweep over the room's bookings instead of checking all pairs
+                    intervals = [(*booking_span(booking), booking) for booking in room.has_booking]
                     
-                    # Check all pairs of bookings for time conflicts
-                    for i, booking1 in enumerate(bookings):
-                        for booking2 in bookings[i+1:]:
-                            if self._bookings_overlap(booking1, booking2):
-                                conflicts.append({
-                                    'room': room,
-                                    'booking1': booking1,
-                                    'booking2': booking2,
-                                    'activity1': self._find_activity_for_booking(booking1),
-                                    'activity2': self._find_activity_for_booking(booking2)
-                                })
+                    for booking1, booking2 in overlapping_pairs(intervals):
+                        conflicts.append({
+                            'room': room,
+                            'booking1': booking1,
+                            'booking2': booking2,
+                            'activity1': self._find_activity_for_booking(booking1),
+                            'activity2': self._find_activity_for_booking(booking2)
+                        })
                 
                 return conflicts
             
             def _bookings_overlap(self, booking1: RoomBooking, booking2: RoomBooking) -> bool:
                 """Check if two bookings have overlapping times."""
-                start1 = booking1.has_start_time if hasattr(booking1, 'has_start_time') else "00:00"
-                end1 = booking1.has_end_time if hasattr(booking1, 'has_end_time') else "23:59"
-                start2 = booking2.has_start_time if hasattr(booking2, 'has_start_time') else "00:00"
-                end2 = booking2.has_end_time if hasattr(booking2, 'has_end_time') else "23:59"
-                
-                return self._times_overlap(start1, end1, start2, end2)
-            
-            def _times_overlap(self, start1: str, end1: str, start2: str, end2: str) -> bool:
-                """Check if two time intervals overlap."""
-                def to_minutes(time_str):
-                    if not time_str:
-                        return 0
-                    parts = time_str.split(':')
-                    return int(parts[0]) * 60 + int(parts[1])
-                
-                s1, e1 = to_minutes(start1), to_minutes(end1)
-                s2, e2 = to_minutes(start2), to_minutes(end2)
-                
-                return not (e1 <= s2 or e2 <= s1)
+                return spans_overlap(booking_span(booking1), booking_span(booking2))
             
             def _find_activity_for_booking(self, booking):
                 """Find the activity associated with a booking."""
-                for activity in list(Lecture.instances()) + list(Exam.instances()):
-                    if hasattr(activity, 'booking_of') and booking in activity.booking_of:
-                        return activity
-                return None
+                return activity_for_booking(booking)
             
-            def _is_room_available_at_time(self, room: Classroom, start_time: str, 
-                                        end_time: str, exclude_booking=None) -> bool:
-                """Check if room is available during specified time."""
+            def _is_room_available_at_time(self, room: Classroom, span, exclude_booking=None) -> bool:
+                """Check if room is available during the (start, end) minute span."""
                 if not hasattr(room, 'has_booking') or not room.has_booking:
                     return True
                 
@@ -539,10 +714,7 @@ with onto:
                     if booking == exclude_booking:
                         continue
                     
-                    booking_start = booking.has_start_time if hasattr(booking, 'has_start_time') else "00:00"
-                    booking_end = booking.has_end_time if hasattr(booking, 'has_end_time') else "23:59"
-                    
-                    if self._times_overlap(start_time, end_time, booking_start, booking_end):
+                    if spans_overlap(span, booking_span(booking)):
                         return False
                 
                 return True
@@ -555,15 +727,8 @@ with onto:
                         return False
                 
                 # Check equipment
-                if hasattr(activity, 'has_prerequisite') and activity.has_prerequisite:
-                    if not hasattr(room, 'has_prerequisite_equipment') or not room.has_prerequisite_equipment:
-                        return False
-                    
-                    required = set(activity.has_prerequisite)
-                    available = set(room.has_prerequisite_equipment)
-                    
-                    if not required.issubset(available):
-                        return False
+                if not _equipment_catalog().has_all(room, activity):
+                    return False
                 
                 return True
             
@@ -572,41 +737,42 @@ with onto:
                 """Find alternative rooms for a conflicting booking."""
                 alternatives = []
                 
-                start_time = booking.has_start_time if hasattr(booking, 'has_start_time') else "00:00"
-                end_time = booking.has_end_time if hasattr(booking, 'has_end_time') else "23:59"
+                span = booking_span(booking)
                 
                 for room in Classroom.instances():
                     if room == current_room:
                         continue
                     
                     # Check if available at the required time
-                    if not self._is_room_available_at_time(room, start_time, end_time):
+                    if not self._is_room_available_at_time(room, span):
                         continue
                     
                     # Check if room meets requirements
                     if not self._room_meets_requirements(room, activity):
                         continue
                     
-                    # Calculate suitability score
-                    capacity_match = 0
-                    if hasattr(activity, 'has_expected_attendance') and hasattr(room, 'has_capacity'):
-                        utilization = activity.has_expected_attendance / room.has_capacity
-                        if 0.6 <= utilization <= 1.0:
-                            capacity_match = 1.0
-                        elif utilization < 0.6:
-                            capacity_match = utilization / 0.6
-                        else:
-                            capacity_match = max(0, 1.0 - (utilization - 1.0) / 0.4)
-                    
                     alternatives.append({
                         'room': room,
                         'capacity': room.has_capacity if hasattr(room, 'has_capacity') else 0,
-                        'suitability': capacity_match,
+                        'suitability': self._suitability(activity, room),
                         'current_bookings': room.get_booking_count()
                     })
                 
                 return sorted(alternatives, key=lambda x: (-x['suitability'], x['current_bookings']))
             
+            def _suitability(self, activity: Activity, room: Classroom) -> float:
+                """Capacity match score (0-1) used to rank alternative rooms."""
+                capacity_match = 0
+                if hasattr(activity, 'has_expected_attendance') and hasattr(room, 'has_capacity'):
+                    utilization = activity.has_expected_attendance / room.has_capacity
+                    if 0.6 <= utilization <= 1.0:
+                        capacity_match = 1.0
+                    elif utilization < 0.6:
+                        capacity_match = utilization / 0.6
+                    else:
+                        capacity_match = max(0, 1.0 - (utilization - 1.0) / 0.4)
+                return capacity_match
+            
             def generate_conflict_report(self):
                 """Generate a comprehensive report of all booking conflicts."""
                 conflicts = self.find_booking_conflicts()
@@ -718,47 +884,99 @@ with onto:
                 
                 new_room = alternatives[use_alternative]['room']
                 
-                # Move the booking
-                room.remove_booking(booking_to_move)
-                new_room.add_booking(booking_to_move)
-                
-                # Update activity location
-                activity_to_move.takes_place_in = [new_room]
+                # Move the booking; any failure leaves both rooms and the activity as they were
+                with Transaction() as tx:
+                    _move_room_booking(tx, booking_to_move, activity_to_move, room, new_room)
                 
                 return True
             
-            def auto_resolve_all_conflicts(self):
-                """Automatically resolve all booking conflicts."""
-                conflicts = self.find_booking_conflicts()
-                resolved = []
-                failed = []
+            def plan_conflict_resolution(self):
+                """
+                Plan a consistent set of moves that clears all conflicts in one pass.
                 
-                for conflict in conflicts:
-                    activity_name = None
-                    old_room = conflict['room'].has_name
+                In each overbooked room a non-overlapping set of bookings is kept, chosen greedily
+                by priority (bookings without an activity first, since they can't be moved). The
+                others are placed, highest priority first, into the most suitable room that is free
+                in the planned schedule; that schedule already holds every current booking and every
+                planned move, so no move can create a new conflict.
+                
+                Returns (moves, unplaced): moves as (booking, activity, from_room, to_room) tuples,
+                unplaced as (booking, activity, room) for bookings that have to stay where they are.
+                """
+                conflicted = {}
+                for conflict in self.find_booking_conflicts():
+                    conflicted.setdefault(conflict['room'], set()).update((conflict['booking1'], conflict['booking2']))
+                
+                def stay_order(booking):
+                    return (activity_for_booking(booking) is not None, -(booking.has_priority or 0),
+                            booking_span(booking)[1], booking.name)
+                
+                to_move = []
+                for room, bookings in conflicted.items():
+                    kept = RoomSchedule()
+                    for seq, booking in enumerate(sorted(bookings, key=stay_order)):
+                        start, end = booking_span(booking)
+                        if kept.is_free(start, end):
+                            kept.add(start, end, seq, booking)
+                        else:
+                            to_move.append((booking, room))
+                
+                seq = 0
+                schedules = {}
+                
+                def planned(room):
+                    nonlocal seq
+                    if room not in schedules:
+                        schedule = RoomSchedule()
+                        for booking in (room.has_booking or []):
+                            seq += 1
+                            schedule.add(*booking_span(booking), seq, booking)
+                        schedules[room] = schedule
+                    return schedules[room]
+                
+                rooms = list(Classroom.instances())
+                moves = []
+                unplaced = []
+                to_move.sort(key=lambda m: (-(m[0].has_priority or 0), booking_span(m[0]), m[0].name))
+                for booking, from_room in to_move:
+                    activity = activity_for_booking(booking)
+                    start, end = booking_span(booking)
+                    target = None
+                    if activity is not None:
+                        candidates = [r for r in rooms
+                                      if r != from_room and self._room_meets_requirements(r, activity)]
+                        candidates.sort(key=lambda r: (-self._suitability(activity, r), r.get_booking_count()))
+                        target = next((r for r in candidates if planned(r).is_free(start, end)), None)
                     
-                    if self.resolve_conflict(conflict):
-                        # Find which activity was moved
-                        priority1 = conflict['booking1'].has_priority if hasattr(conflict['booking1'], 'has_priority') else 0
-                        priority2 = conflict['booking2'].has_priority if hasattr(conflict['booking2'], 'has_priority') else 0
-                        
-                        if priority1 < priority2 and conflict['activity1']:
-                            activity_name = conflict['activity1'].has_name if hasattr(conflict['activity1'], 'has_name') else 'Unknown'
-                            new_room = conflict['activity1'].takes_place_in[0].has_name if conflict['activity1'].takes_place_in else 'Unknown'
-                        elif conflict['activity2']:
-                            activity_name = conflict['activity2'].has_name if hasattr(conflict['activity2'], 'has_name') else 'Unknown'
-                            new_room = conflict['activity2'].takes_place_in[0].has_name if conflict['activity2'].takes_place_in else 'Unknown'
-                        
-                        resolved.append({
-                            'activity': activity_name,
-                            'from_room': old_room,
-                            'to_room': new_room
-                        })
-                    else:
-                        failed.append({
-                            'room': old_room,
-                            'reason': 'No suitable alternative found'
-                        })
+                    if target is None:
+                        unplaced.append((booking, activity, from_room))
+                        continue
+                    
+                    seq += 1
+                    planned(target).add(start, end, seq, booking)
+                    moves.append((booking, activity, from_room, target))
+                
+                return moves, unplaced
+            
+            def auto_resolve_all_conflicts(self):
+                """Resolve all booking conflicts with one planned, all-or-nothing batch of moves."""
+                moves, unplaced = self.plan_conflict_resolution()
+                
+                # All moves or none: an exception rolls back the moves already made
+                with Transaction() as tx:
+                    for booking, activity, from_room, to_room in moves:
+                        _move_room_booking(tx, booking, activity, from_room, to_room)
+                
+                resolved = [{
+                    'activity': activity.has_name if hasattr(activity, 'has_name') else 'Unknown',
+                    'from_room': from_room.has_name,
+                    'to_room': to_room.has_name
+                } for booking, activity, from_room, to_room in moves]
+                
+                failed = [{
+                    'room': room.has_name,
+                    'reason': 'No suitable alternative found' if activity else 'Booking has no activity to relocate'
+                } for booking, activity, room in unplaced]
                 
                 return {
                     'resolved': resolved,
@@ -766,6 +984,11 @@ with onto:
                 }
         
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="University ontology demo")
+    parser.add_argument("--hermit", action="store_true",
+                        help="classify rooms with the HermiT reasoner (needs Java) instead of the closed-world check")
+    args = parser.parse_args()
+
     with onto:
         # Professors
         prof_smith = Professor("Prof_Smith")
@@ -1096,9 +1319,9 @@ if __name__ == "__main__":
         david.enrolled_in = [alg]
         david.advised_by = [prof_jones]
         
-        # Run reasoner to infer class memberships
-        sync_reasoner(infer_property_values=True)
+        # Infer class memberships
+        classify_rooms(use_hermit=args.hermit)
 
                 # Save the ontology to a file
-        onto.save(file="university.owl", format="rdfxml")
+        save_ontology(onto, "university.owl")
         print("\nOntology saved to university.owl")
\ No newline at end of file